@@ -0,0 +1,53 @@
+"""人机对局 AI 的基准测试
+
+在固定随机种子生成的对局中取若干局面，按给定的思考时间直接调用搜索函数
+（不经过进程池），报告每秒搜索的节点数与完成的搜索深度。
+
+用法：python -m benchmarks.ai [--budget 1.0] [--positions 5] [-o result.json]
+"""
+
+from .common import init_plugin, parse_args, report
+
+
+def main():
+    args = parse_args(__doc__ or "", budget=1.0, positions=5, seed=0)
+    init_plugin()
+
+    from .games import GAMES, play, replay
+
+    results = []
+    for rule, cls in GAMES.items():
+        if cls.ai_search is None:
+            continue
+        for index in range(args.positions):
+            positions = play(cls, args.seed + index)
+            # 随机对局的中后盘常有立即取胜的着法，只取前若干手的局面
+            for stage, moves in (
+                ("opening", positions[:4]),
+                ("early", positions[:10]),
+            ):
+                game = replay(cls, moves)
+                result = cls.ai_search(
+                    game.size, game.b_board, game.w_board, game.moveside, args.budget
+                )
+                results.append(
+                    {
+                        "benchmark": "search",
+                        "rule": rule,
+                        "seed": args.seed + index,
+                        "stage": stage,
+                        "moves": len(moves),
+                        "depth": result.depth,
+                        "nodes": result.nodes,
+                        "elapsed_s": result.elapsed,
+                        "nodes_per_sec": (
+                            result.nodes / result.elapsed if result.elapsed else 0
+                        ),
+                    }
+                )
+
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
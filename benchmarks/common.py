@@ -0,0 +1,84 @@
+"""基准测试的公共工具，需在仓库根目录以 `python -m benchmarks.xxx` 运行"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Iterable
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import nonebot
+
+
+def parse_args(description: str, **options: Any) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("-o", "--output", help="将结果以 JSON 写入文件")
+    for name, default in options.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(default), default=default
+        )
+    return parser.parse_args()
+
+
+def init_plugin(database: Optional[Path] = None):
+    """初始化 NoneBot 并加载插件，使用本地 SQLite 数据库"""
+    if database is None:
+        database = Path(tempfile.mkdtemp()) / "boardgame.db"
+    nonebot.init(
+        driver="~none",
+        log_level="WARNING",
+        sqlalchemy_database_url=f"sqlite+aiosqlite:///{database}",
+        alembic_startup_check=False,
+    )
+    nonebot.load_plugin("nonebot_plugin_boardgame")
+
+
+async def init_database():
+    from nonebot_plugin_orm import init_orm
+
+    await init_orm()
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    """将耗时（秒）汇总为微秒"""
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "median_us": statistics.median(timings) * 1e6,
+        "p95_us": timings[int(len(timings) * 0.95) - 1] * 1e6,
+        "min_us": timings[0] * 1e6,
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[Any]], repeat: int
+) -> dict[str, float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def report(results: Iterable[dict[str, Any]], output: Optional[str] = None):
+    """每条结果输出一行 JSON，指定 `output` 时同时写入文件"""
+    results = list(results)
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    if output:
+        Path(output).write_text(
+            json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
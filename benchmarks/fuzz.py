@@ -0,0 +1,140 @@
+"""规则引擎的差分测试
+
+用固定随机种子生成大量随机对局，逐手同时交给插件的 `Game` 与 `reference.py` 中的
+参考引擎，断言两者的落子结果、非法落子的原因、提子数与棋盘完全一致，并穿插悔棋。
+指定 `--legal` 时每一手还会比对 `legal_moves` 的结果。报告每个引擎每秒处理的落子数。
+
+用法：python -m benchmarks.fuzz [--games 1000] [--go-size 9] [--legal 1]
+      [-o result.json]
+"""
+
+import random
+import time
+from typing import Any, Optional
+
+from .common import init_plugin, parse_args, report
+
+UNDO_RATE = 0.03
+"""每一手之前悔棋的概率"""
+RANDOM_RATE = 0.2
+"""黑白棋中不从合法落子里选、而在任意空位落子的概率"""
+
+
+class Mismatch(AssertionError):
+    pass
+
+
+def main():
+    args = parse_args(__doc__ or "", games=1000, go_size=9, legal=1, seed=0)
+    init_plugin()
+
+    from boardgame_engine.bitboard import popcount
+    from nonebot_plugin_boardgame.game import Game, MoveResult, Pos
+    from nonebot_plugin_boardgame.go import Go
+    from nonebot_plugin_boardgame.gomoku import Gomoku
+    from nonebot_plugin_boardgame.othello import Othello
+
+    from .reference import Reference, ReferenceGo, ReferenceGomoku, ReferenceOthello
+
+    def apply(engine: Any, pos: Pos) -> tuple[Optional[MoveResult], str, float]:
+        """落子，返回 (结果, 非法落子的原因, 耗时)"""
+        start = time.perf_counter()
+        try:
+            result = engine.update(pos)
+        except ValueError as e:
+            return None, str(e), time.perf_counter() - start
+        return result, "", time.perf_counter() - start
+
+    def choose(rand: random.Random, game: Game) -> Pos:
+        stones = game.b_board | game.w_board
+        empty = game.full ^ stones
+        candidates = empty
+        if isinstance(game, Othello):
+            moves = game.legal_moves(game.moveside)
+            if not moves:
+                return Pos.null()
+            if rand.random() >= RANDOM_RATE:
+                candidates = moves
+        elif isinstance(game, Go) and stones and rand.random() < 0.7:
+            # 偏向在已有子旁边落子，更容易出现提子与打劫
+            candidates = game.adjacent(stones) & empty or empty
+        indexes = [index for index in range(game.area) if candidates >> index & 1]
+        return game.decode(rand.choice(indexes))
+
+    def fuzz(rule: str, game: Game, reference: Reference, seed: int) -> int:
+        rand = random.Random(seed)
+        limit = game.area * 3
+        result: Optional[MoveResult] = None
+        moves = 0
+        while moves < limit and result in (None, MoveResult.SKIP, MoveResult.ILLEGAL):
+            if game.moves and rand.random() < UNDO_RATE:
+                game.pop()
+                reference.pop()
+                result = None
+            elif not (game.full ^ (game.b_board | game.w_board)):
+                break
+            else:
+                pos = Pos.null() if result == MoveResult.SKIP else choose(rand, game)
+                before = popcount(game.b_board | game.w_board)
+                result, error, elapsed = apply(game, pos)
+                timings[rule, "plugin"] += elapsed
+                expected, expected_error, elapsed = apply(reference, pos)
+                timings[rule, "reference"] += elapsed
+                counts[rule] += 1
+                if (result, error) != (expected, expected_error):
+                    raise Mismatch(
+                        f"{rule} seed={seed} move={moves} {pos}: "
+                        f"{result} {error!r} != {expected} {expected_error!r}"
+                    )
+                after = popcount(game.b_board | game.w_board)
+                captured = before + game.in_range(pos) - after
+                if not error and result != MoveResult.ILLEGAL:
+                    captures[rule] += max(captured, 0)
+                moves += 1
+            if (game.b_board, game.w_board, game.moveside) != (
+                reference.b_board,
+                reference.w_board,
+                reference.moveside,
+            ):
+                raise Mismatch(f"{rule} seed={seed} move={moves}: 棋盘不一致")
+            if args.legal and isinstance(reference, (ReferenceOthello, ReferenceGo)):
+                assert isinstance(game, (Othello, Go))
+                value = game.moveside
+                if game.legal_moves(value) != reference.legal_moves(value):
+                    raise Mismatch(f"{rule} seed={seed} move={moves}: 合法落子不一致")
+        return moves
+
+    engines = {
+        "othello": lambda: (Othello(), ReferenceOthello()),
+        "gomoku": lambda: (Gomoku(), ReferenceGomoku()),
+        "go": lambda: (Go(args.go_size), ReferenceGo(args.go_size)),
+    }
+    timings: dict[tuple[str, str], float] = {
+        (rule, engine): 0 for rule in engines for engine in ("plugin", "reference")
+    }
+    counts = dict.fromkeys(engines, 0)
+    captures = dict.fromkeys(engines, 0)
+
+    results = []
+    for rule, create in engines.items():
+        for index in range(args.games):
+            game, reference = create()
+            fuzz(rule, game, reference, args.seed + index)
+        for engine in ("plugin", "reference"):
+            results.append(
+                {
+                    "benchmark": "fuzz",
+                    "rule": rule,
+                    "engine": engine,
+                    "games": args.games,
+                    "moves": counts[rule],
+                    "captured_stones": captures[rule],
+                    "moves_per_sec": counts[rule] / timings[rule, engine],
+                }
+            )
+
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
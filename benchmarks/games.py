@@ -0,0 +1,62 @@
+"""用固定随机种子生成的对局，供各基准测试重放"""
+
+import random
+from typing import Optional
+
+from boardgame_engine.bitboard import indexes
+from nonebot_plugin_boardgame.game import Game, MoveResult, Pos
+from nonebot_plugin_boardgame.go import Go
+from nonebot_plugin_boardgame.gomoku import Gomoku
+from nonebot_plugin_boardgame.othello import Othello
+
+GAMES: dict[str, type[Game]] = {"gomoku": Gomoku, "othello": Othello, "go": Go}
+
+GO_MOVES = 300
+"""围棋随机对局的最大手数，随机落子很难自然终局"""
+
+
+def play(cls: type[Game], seed: int) -> list[Pos]:
+    """随机落子直到终局，返回落子序列"""
+    rand = random.Random(seed)
+    game = cls()
+    positions: list[Pos] = []
+    result: Optional[MoveResult] = None
+    while result is None or result == MoveResult.SKIP:
+        empty = game.full ^ (game.b_board | game.w_board)
+        if isinstance(game, Othello):
+            candidates = indexes(game.legal_moves(game.moveside))
+        elif isinstance(game, Go):
+            if len(positions) >= GO_MOVES:
+                break
+            # 不填自己的眼，否则随机对局会反复提子
+            own = game.b_board if game.moveside == 1 else game.w_board
+            candidates = [
+                index
+                for index in indexes(empty)
+                if game.neighbors[index] & ~own & game.full
+            ]
+        else:
+            candidates = indexes(empty)
+        rand.shuffle(candidates)
+        pos = Pos.null()
+        for index in candidates:
+            try:
+                result = game.update(game.points[index])
+            except ValueError:
+                # 只有围棋会因不入子或全局同形拒绝落子
+                continue
+            pos = game.points[index]
+            break
+        else:
+            if not isinstance(game, Othello):
+                break
+            result = game.update(pos)
+        positions.append(pos)
+    return positions
+
+
+def replay(cls: type[Game], positions: list[Pos]) -> Game:
+    game = cls()
+    for pos in positions:
+        game.update(pos)
+    return game
@@ -0,0 +1,169 @@
+"""走法生成的 perft 测试
+
+统计从初始局面出发 N 手内可到达的叶子局面数，每种规则用多个引擎分别计算，
+断言结果一致并报告每秒局面数。黑白棋跳过回合计为一手，终局局面计为叶子；
+围棋在小棋盘上计算，不计停一手。
+
+- `update`：逐点调用 `Game.update` 试下，非法则跳过，之后 `pop` 悔棋
+- `bitboard`：黑白棋直接在整数棋盘上用 AI 的走法生成
+- `legal_moves`：围棋先用 `Go.legal_moves` 求出合法点再落子
+- `reference`：`reference.py` 中逐格实现的参考引擎
+
+用法：python -m benchmarks.perft [--othello-depth 6] [--go-size 4] [--go-depth 4]
+      [--engines update,reference] [-o result.json]
+"""
+
+import time
+from typing import Callable
+
+from .common import init_plugin, parse_args, report
+
+OTHELLO_PERFT = (1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284)
+"""黑白棋 perft 的公认结果"""
+
+
+def main():
+    args = parse_args(__doc__ or "", othello_depth=6, go_size=4, go_depth=4, engines="")
+    init_plugin()
+
+    from boardgame_engine.othello_ai import flips, legal_moves
+    from nonebot_plugin_boardgame.game import MoveResult, Pos
+    from nonebot_plugin_boardgame.go import Go
+    from nonebot_plugin_boardgame.othello import Othello
+
+    from .reference import ReferenceGo, ReferenceOthello
+
+    def othello_update(game, depth: int) -> int:
+        """`game` 为 `Othello` 或 `ReferenceOthello`"""
+        if depth == 0:
+            return 1
+        leaves = 0
+        moved = False
+        stones = game.b_board | game.w_board
+        for index in range(64):
+            if stones >> index & 1:
+                continue
+            result = game.update(Pos(*divmod(index, 8)))
+            if result == MoveResult.ILLEGAL:
+                continue
+            moved = True
+            if result in (None, MoveResult.SKIP):
+                leaves += othello_update(game, depth - 1)
+            else:
+                leaves += 1
+            game.pop()
+        if not moved:
+            game.update(Pos.null())
+            leaves += othello_update(game, depth - 1)
+            game.pop()
+        return leaves
+
+    def othello_bitboard(own: int, opponent: int, depth: int) -> int:
+        if depth == 0:
+            return 1
+        moves = legal_moves(own, opponent)
+        if not moves:
+            if not legal_moves(opponent, own):
+                return 1
+            return othello_bitboard(opponent, own, depth - 1)
+        leaves = 0
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            diff = flips(own, opponent, bit)
+            leaves += othello_bitboard(opponent ^ diff, own | bit | diff, depth - 1)
+        return leaves
+
+    def go_update(game, depth: int) -> int:
+        """`game` 为 `Go` 或 `ReferenceGo`"""
+        if depth == 0:
+            return 1
+        leaves = 0
+        moved = False
+        stones = game.b_board | game.w_board
+        for index in range(game.size * game.size):
+            if stones >> index & 1:
+                continue
+            try:
+                game.update(Pos(*divmod(index, game.size)))
+            except ValueError:
+                continue
+            moved = True
+            leaves += go_update(game, depth - 1)
+            game.pop()
+        return leaves if moved else 1
+
+    def go_legal_moves(game: Go, depth: int) -> int:
+        if depth == 0:
+            return 1
+        moves = game.legal_moves(game.moveside)
+        if not moves:
+            return 1
+        leaves = 0
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            game.update(game.decode(bit.bit_length() - 1))
+            leaves += go_legal_moves(game, depth - 1)
+            game.pop()
+        return leaves
+
+    othello = Othello()
+    perfts: dict[str, tuple[int, dict[str, Callable[[], int]]]] = {
+        "othello": (
+            args.othello_depth,
+            {
+                "update": lambda: othello_update(Othello(), args.othello_depth),
+                "bitboard": lambda: othello_bitboard(
+                    othello.b_board, othello.w_board, args.othello_depth
+                ),
+                "reference": lambda: othello_update(
+                    ReferenceOthello(), args.othello_depth
+                ),
+            },
+        ),
+        "go": (
+            args.go_depth,
+            {
+                "update": lambda: go_update(Go(args.go_size), args.go_depth),
+                "legal_moves": lambda: go_legal_moves(Go(args.go_size), args.go_depth),
+                "reference": lambda: go_update(
+                    ReferenceGo(args.go_size), args.go_depth
+                ),
+            },
+        ),
+    }
+    selected = set(filter(None, args.engines.split(",")))
+
+    results = []
+    for rule, (depth, engines) in perfts.items():
+        counts: dict[str, int] = {}
+        for engine, perft in engines.items():
+            if selected and engine not in selected:
+                continue
+            start = time.perf_counter()
+            leaves = perft()
+            elapsed = time.perf_counter() - start
+            counts[engine] = leaves
+            results.append(
+                {
+                    "benchmark": "perft",
+                    "rule": rule,
+                    "size": args.go_size if rule == "go" else 8,
+                    "engine": engine,
+                    "depth": depth,
+                    "leaves": leaves,
+                    "elapsed_s": elapsed,
+                    "positions_per_sec": leaves / elapsed,
+                }
+            )
+        assert len(set(counts.values())) <= 1, f"{rule} perft 结果不一致：{counts}"
+        if rule == "othello" and counts and depth < len(OTHELLO_PERFT):
+            expected = OTHELLO_PERFT[depth]
+            assert set(counts.values()) == {expected}, f"应为 {expected}：{counts}"
+
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""GameRecord 索引的基准测试
+
+向本地 SQLite 数据库中写入固定随机种子生成的对局记录，
+分别在有无索引时测量恢复对局与按 game_id 查找的耗时。
+
+用法：python -m benchmarks.record_index [--rows 1000000] [-o result.json]
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from .common import init_database, init_plugin, measure_async, parse_args, report
+
+NAMES = ("五子棋", "黑白棋", "围棋")
+
+
+def make_rows(rand: random.Random, start: int, count: int, sessions: int):
+    epoch = datetime(2024, 1, 1)
+    for index in range(start, start + count):
+        time = epoch + timedelta(minutes=index)
+        yield {
+            "game_id": f"{rand.getrandbits(128):032x}",
+            "session_id": f"qq_group_{rand.randrange(sessions)}",
+            "name": rand.choice(NAMES),
+            "start_time": time,
+            "update_time": time,
+            "is_game_over": rand.random() < 0.95,
+        }
+
+
+async def main():
+    args = parse_args(__doc__ or "", rows=1_000_000, repeat=200, seed=0)
+    init_plugin()
+
+    from nonebot_plugin_orm import get_session
+    from sqlalchemy import insert, select
+
+    from nonebot_plugin_boardgame.model import GameRecord
+
+    await init_database()
+    rand = random.Random(args.seed)
+    sizes = [size for size in (10**3, 10**4, 10**5, 10**6) if size <= args.rows]
+    if args.rows not in sizes:
+        sizes.append(args.rows)
+    sessions = max(args.rows // 20, 1)
+    game_ids: list[str] = []
+    results = []
+
+    async def toggle_indexes(create: bool):
+        async with get_session() as session:
+            connection = await session.connection()
+            for index in GameRecord.__table__.indexes:
+                func = index.create if create else index.drop
+                await connection.run_sync(lambda conn: func(conn))
+            await session.commit()
+
+    async def resume():
+        statement = (
+            select(GameRecord)
+            .where(
+                GameRecord.session_id == f"qq_group_{rand.randrange(sessions)}",
+                GameRecord.name == rand.choice(NAMES),
+                GameRecord.is_game_over == False,  # noqa
+            )
+            .order_by(GameRecord.update_time.desc())
+        )
+        async with get_session() as session:
+            await session.scalar(statement)
+
+    async def lookup():
+        statement = select(GameRecord.id).where(
+            GameRecord.game_id == rand.choice(game_ids)
+        )
+        async with get_session() as session:
+            await session.scalar(statement)
+
+    total = 0
+    for size in sizes:
+        async with get_session() as session:
+            while total < size:
+                count = min(10_000, size - total)
+                rows = list(make_rows(rand, total, count, sessions))
+                game_ids.extend(row["game_id"] for row in rows)
+                await session.execute(insert(GameRecord), rows)
+                total += count
+            await session.commit()
+
+        for indexed in (True, False):
+            if not indexed:
+                await toggle_indexes(create=False)
+            for name, func in (("resume", resume), ("lookup", lookup)):
+                repeat = args.repeat if indexed else max(args.repeat // 20, 3)
+                result = await measure_async(func, repeat)
+                results.append(
+                    {"benchmark": name, "rows": size, "indexed": indexed, **result}
+                )
+            if not indexed:
+                await toggle_indexes(create=True)
+
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
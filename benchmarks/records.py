@@ -0,0 +1,70 @@
+"""对局记录读写的基准测试
+
+在本地 SQLite 数据库中测量不同手数的对局首次保存 (`save_record`)、
+落一子后的增量保存以及读取恢复 (`load_record`) 的耗时。
+
+用法：python -m benchmarks.records [--repeat 50] [-o result.json]
+"""
+
+import asyncio
+import time
+
+from .common import (
+    init_database,
+    init_plugin,
+    measure_async,
+    parse_args,
+    report,
+    summarize,
+)
+
+LENGTHS = (10, 50, 100, 200, 300)
+
+
+async def main():
+    args = parse_args(__doc__ or "", repeat=50, seed=0)
+    init_plugin()
+
+    from .games import GAMES, play, replay
+
+    await init_database()
+    results = []
+    for rule, cls in GAMES.items():
+        positions = play(cls, args.seed)
+        lengths = [length for length in LENGTHS if length < len(positions)]
+        lengths.append(len(positions) - 1)
+        for length in lengths:
+            session_id = f"{rule}_{length}"
+            saves: list[float] = []
+            for _ in range(args.repeat):
+                game = replay(cls, positions[:length])
+                start = time.perf_counter()
+                await game.save_record(session_id)
+                saves.append(time.perf_counter() - start)
+
+            # 已保存的对局再落一子，只写入新增的一手
+            moves: list[float] = []
+            for _ in range(args.repeat):
+                game.update(positions[length])
+                start = time.perf_counter()
+                await game.save_record(session_id)
+                moves.append(time.perf_counter() - start)
+                game.pop()
+
+            async def load():
+                await cls.load_record(session_id)
+
+            for name, result in (
+                ("save_record", summarize(saves)),
+                ("save_record_move", summarize(moves)),
+                ("load_record", await measure_async(load, args.repeat)),
+            ):
+                results.append(
+                    {"benchmark": name, "rule": rule, "moves": length, **result}
+                )
+
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
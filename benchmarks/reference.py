@@ -0,0 +1,204 @@
+"""用二维列表逐格实现的参考规则引擎，只求直观正确，供差分测试对照
+
+接口与 `Game` 子类一致：`update` 返回 `MoveResult` 或 None，非法落子抛出
+`ValueError`；`pop` 悔一手；`b_board`、`w_board` 按 `x * size + y` 编码。
+"""
+
+from typing import Optional
+
+from nonebot_plugin_boardgame.game import MoveResult, Pos
+
+Grid = list[list[int]]
+
+
+class Reference:
+    def __init__(self, size: int):
+        self.size = size
+        self.grid: Grid = [[0] * size for _ in range(size)]
+        self.moveside = 1
+        self.history: list[tuple[Grid, int]] = []
+
+    def in_range(self, x: int, y: int) -> bool:
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def board(self, value: int) -> int:
+        board = 0
+        for x, row in enumerate(self.grid):
+            for y, cell in enumerate(row):
+                if cell == value:
+                    board |= 1 << (x * self.size + y)
+        return board
+
+    @property
+    def b_board(self) -> int:
+        return self.board(1)
+
+    @property
+    def w_board(self) -> int:
+        return self.board(-1)
+
+    def count(self, value: int) -> int:
+        return sum(row.count(value) for row in self.grid)
+
+    def checkpoint(self):
+        self.history.append(([row[:] for row in self.grid], self.moveside))
+
+    def pop(self):
+        self.grid, self.moveside = self.history.pop()
+
+    def update(self, pos: Pos) -> Optional[MoveResult]:
+        raise NotImplementedError
+
+
+class ReferenceOthello(Reference):
+    DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+    def __init__(self):
+        super().__init__(8)
+        self.grid[3][3] = self.grid[4][4] = -1
+        self.grid[3][4] = self.grid[4][3] = 1
+
+    def flips(self, x: int, y: int, value: int) -> list[tuple[int, int]]:
+        if self.grid[x][y]:
+            return []
+        result = []
+        for dx, dy in self.DIRECTIONS:
+            line = []
+            i, j = x + dx, y + dy
+            while self.in_range(i, j) and self.grid[i][j] == -value:
+                line.append((i, j))
+                i, j = i + dx, j + dy
+            if line and self.in_range(i, j) and self.grid[i][j] == value:
+                result.extend(line)
+        return result
+
+    def legal_moves(self, value: int) -> int:
+        moves = 0
+        for x in range(8):
+            for y in range(8):
+                if self.flips(x, y, value):
+                    moves |= 1 << (x * 8 + y)
+        return moves
+
+    def result(self) -> MoveResult:
+        black, white = self.count(1), self.count(-1)
+        if black == white:
+            return MoveResult.DRAW
+        return MoveResult.BLACK_WIN if black > white else MoveResult.WHITE_WIN
+
+    def update(self, pos: Pos) -> Optional[MoveResult]:
+        value = self.moveside
+        if not self.in_range(pos.x, pos.y):
+            self.checkpoint()
+            self.moveside = -value
+            return MoveResult.SKIP
+        flips = self.flips(pos.x, pos.y, value)
+        if not flips:
+            return MoveResult.ILLEGAL
+        self.checkpoint()
+        self.grid[pos.x][pos.y] = value
+        for i, j in flips:
+            self.grid[i][j] = value
+        self.moveside = -value
+        if not self.count(0):
+            return self.result()
+        if not self.legal_moves(-value):
+            if not self.legal_moves(value):
+                return self.result()
+            return MoveResult.SKIP
+        return None
+
+
+class ReferenceGo(Reference):
+    def __init__(self, size: int = 19):
+        super().__init__(size)
+        self.seen: dict[tuple[tuple[int, ...], ...], None] = {self.key(): None}
+        """出现过的局面，按出现顺序排列，全局同形禁止重复所以不会有相同的键"""
+
+    def key(self) -> tuple[tuple[int, ...], ...]:
+        return tuple(tuple(row) for row in self.grid)
+
+    def neighbors(self, x: int, y: int) -> list[tuple[int, int]]:
+        return [
+            (i, j)
+            for i, j in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))
+            if self.in_range(i, j)
+        ]
+
+    def group(self, x: int, y: int) -> tuple[set[tuple[int, int]], int]:
+        """返回 (x, y) 所在的整块棋及其气数"""
+        value = self.grid[x][y]
+        stones = {(x, y)}
+        liberties = set()
+        stack = [(x, y)]
+        while stack:
+            for i, j in self.neighbors(*stack.pop()):
+                if self.grid[i][j] == 0:
+                    liberties.add((i, j))
+                elif self.grid[i][j] == value and (i, j) not in stones:
+                    stones.add((i, j))
+                    stack.append((i, j))
+        return stones, len(liberties)
+
+    def update(self, pos: Pos) -> Optional[MoveResult]:
+        value = self.moveside
+        grid = [row[:] for row in self.grid]
+        self.grid[pos.x][pos.y] = value
+        for i, j in self.neighbors(pos.x, pos.y):
+            if self.grid[i][j] == -value:
+                stones, liberties = self.group(i, j)
+                if not liberties:
+                    for x, y in stones:
+                        self.grid[x][y] = 0
+        if not self.group(pos.x, pos.y)[1]:
+            self.grid = grid
+            raise ValueError("不入子")
+        if self.key() in self.seen:
+            self.grid = grid
+            raise ValueError("全局同形")
+        self.history.append((grid, value))
+        self.seen[self.key()] = None
+        self.moveside = -value
+        return None
+
+    def pop(self):
+        super().pop()
+        self.seen.popitem()
+
+    def legal_moves(self, value: int) -> int:
+        assert value == self.moveside
+        moves = 0
+        for x in range(self.size):
+            for y in range(self.size):
+                if self.grid[x][y]:
+                    continue
+                try:
+                    self.update(Pos(x, y))
+                except ValueError:
+                    continue
+                self.pop()
+                moves |= 1 << (x * self.size + y)
+        return moves
+
+
+class ReferenceGomoku(Reference):
+    def __init__(self):
+        super().__init__(15)
+
+    def update(self, pos: Pos) -> Optional[MoveResult]:
+        value = self.moveside
+        self.checkpoint()
+        self.grid[pos.x][pos.y] = value
+        self.moveside = -value
+        for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                i, j = pos.x + dx * sign, pos.y + dy * sign
+                while self.in_range(i, j) and self.grid[i][j] == value:
+                    count += 1
+                    i, j = i + dx * sign, j + dy * sign
+            if count >= 5:
+                return MoveResult(value)
+        if not self.count(0):
+            return MoveResult.DRAW
+        return None
@@ -0,0 +1,49 @@
+"""棋盘绘制的基准测试
+
+分别测量空棋盘、对局中途与终局时 `draw_svg`、`Tag.outer`
+与 Pillow 绘制 (`draw_image`) 的耗时，绘制结果不经过图片缓存。
+
+用法：python -m benchmarks.render [--repeat 200] [-o result.json]
+"""
+
+from .common import init_plugin, measure, parse_args, report
+
+
+def main():
+    args = parse_args(__doc__ or "", repeat=200, seed=0)
+    init_plugin()
+
+    from .games import GAMES, play, replay
+
+    results = []
+    for rule, cls in GAMES.items():
+        positions = play(cls, args.seed)
+        stages = {
+            "empty": [],
+            "mid": positions[: len(positions) // 2],
+            "full": positions,
+        }
+        for stage, moves in stages.items():
+            game = replay(cls, moves)
+            svg = game.draw_svg()
+            for name, func in (
+                ("draw_svg", game.draw_svg),
+                ("outer", svg.outer),
+                ("draw_svg+outer", lambda: game.draw_svg().outer()),
+                ("draw_image", game.draw_image),
+            ):
+                results.append(
+                    {
+                        "benchmark": name,
+                        "rule": rule,
+                        "stage": stage,
+                        "moves": len(moves),
+                        **measure(func, args.repeat),
+                    }
+                )
+
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""规则引擎的基准测试
+
+用固定随机种子生成完整对局，测量从空棋盘重放整局时 `update` 的耗时，
+以及对局中每个局面上 `legal_moves` 的耗时。
+
+用法：python -m benchmarks.rules [--games 20] [--repeat 5] [-o result.json]
+"""
+
+import time
+
+from .common import init_plugin, measure, parse_args, report, summarize
+
+
+def main():
+    args = parse_args(__doc__ or "", games=20, repeat=5, seed=0)
+    init_plugin()
+
+    from nonebot_plugin_boardgame.go import Go
+    from nonebot_plugin_boardgame.othello import Othello
+
+    from .games import GAMES, play, replay
+
+    results = []
+    for rule, cls in GAMES.items():
+        records = [play(cls, args.seed + index) for index in range(args.games)]
+        moves = sum(len(positions) for positions in records)
+        timings: list[float] = []
+        for _ in range(args.repeat):
+            for positions in records:
+                game = cls()
+                update = game.update
+                start = time.perf_counter()
+                for pos in positions:
+                    update(pos)
+                timings.append(time.perf_counter() - start)
+        total = sum(timings)
+        results.append(
+            {
+                "benchmark": "update",
+                "rule": rule,
+                "games": args.games,
+                "moves_per_game": moves / args.games,
+                "moves_per_sec": moves * args.repeat / total,
+                **summarize(timings),
+            }
+        )
+
+        # 在第一局中均匀取 10 个局面
+        positions = records[0]
+        for step in range(0, len(positions), max(len(positions) // 10, 1)):
+            game = replay(cls, positions[:step])
+            if not isinstance(game, (Othello, Go)):
+                continue
+            legal_moves = game.legal_moves
+            moveside = game.moveside
+            results.append(
+                {
+                    "benchmark": "legal_moves",
+                    "rule": rule,
+                    "moves": step,
+                    **measure(lambda: legal_moves(moveside), args.repeat * 20),
+                }
+            )
+
+    report(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
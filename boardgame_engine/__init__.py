@@ -0,0 +1,4 @@
+"""棋类 AI 的搜索与位棋盘运算
+
+只依赖标准库，不导入插件：AI 进程池的子进程只需加载这个包，不会初始化 NoneBot 与插件。
+"""
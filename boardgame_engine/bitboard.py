@@ -0,0 +1,77 @@
+"""位棋盘的通用运算与 AI 搜索共用的类型"""
+
+from typing import NamedTuple
+
+
+def popcount(board: int) -> int:
+    return bin(board).count("1")
+
+
+def bits(board: int) -> list[int]:
+    """拆分为只含一个子的棋盘，按位置编号从小到大排列"""
+    result = []
+    while board:
+        low = board & -board
+        board ^= low
+        result.append(low)
+    return result
+
+
+def indexes(board: int) -> list[int]:
+    """`board` 中各个子的位置编号，从小到大排列"""
+    return [bit.bit_length() - 1 for bit in bits(board)]
+
+
+class Grid:
+    """边长为 `size` 的正方形棋盘，位置编号为 `x * size + y`"""
+
+    def __init__(self, size: int):
+        self.size: int = size
+        self.area: int = size * size
+        self.full: int = (1 << self.area) - 1
+        left_edge = sum(1 << (i * size) for i in range(size))
+        self.not_left: int = self.full ^ left_edge
+        """去掉最左一列的掩码"""
+        self.not_right: int = self.full ^ (left_edge << max(size - 1, 0))
+        """去掉最右一列的掩码"""
+
+    def shift(self, board: int, dx: int, dy: int) -> int:
+        """将棋盘整体平移一格，`dx`、`dy` 取值为 -1、0、1"""
+        offset = dx * self.size + dy
+        board = board << offset if offset >= 0 else board >> -offset
+        if dy > 0:
+            board &= self.not_left
+        elif dy < 0:
+            board &= self.not_right
+        return board & self.full
+
+
+class SearchResult(NamedTuple):
+    move: int
+    """落子位置编号，-1 表示跳过"""
+    score: int
+    depth: int
+    """完整搜索的深度"""
+    nodes: int
+    elapsed: float
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+TableEntry = tuple[int, int, int, int]
+"""置换表的值：(深度, 类型, 分值, 最佳落子)，类型 0 为精确值、1 为下界、2 为上界"""
+
+
+def usable(entry: TableEntry, depth: int, alpha: int, beta: int) -> bool:
+    """置换表中的结果能否直接作为窗口 (alpha, beta) 内的搜索结果"""
+    entry_depth, flag, value, _ = entry
+    return entry_depth >= depth and (
+        flag == 0 or (flag == 1 and value >= beta) or (flag == 2 and value <= alpha)
+    )
+
+
+def bound(alpha: int, beta: int, value: int) -> int:
+    """在窗口 (alpha, beta) 内搜索得到 `value` 时置换表记录的类型"""
+    return 0 if alpha < value < beta else 1 if value >= beta else 2
@@ -0,0 +1,191 @@
+"""五子棋 AI：在位棋盘上做带置换表的迭代加深 alpha-beta 搜索
+
+局面分按五连窗口统计，每个节点只展开落子后局面分最高的若干个邻近空位。
+"""
+
+import time
+from functools import lru_cache
+
+from .bitboard import (
+    Grid,
+    SearchResult,
+    SearchTimeout,
+    TableEntry,
+    bound,
+    indexes,
+    popcount,
+    usable,
+)
+
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+WIN = 1_000_000
+"""能立即连成五子的分值，实际分值会减去到达的步数，使 AI 选择最快的胜法"""
+WEIGHTS = (0, 1, 8, 64, 512)
+"""含有 0~4 颗己方棋子且没有对方棋子的五连窗口的分值"""
+BRANCHES = (12, 8)
+"""根节点与内部节点最多搜索的候选数"""
+MAX_DEPTH = 12
+
+
+class Board(Grid):
+    """五连窗口的统计与检测，按棋盘大小缓存"""
+
+    def aligned(self, board: int, dx: int, dy: int, steps: int) -> list[int]:
+        """第 j 项的每一位表示该位置沿方向前进 j 格处是否有子，j 为 0..steps"""
+        boards = [board]
+        for _ in range(steps):
+            board = self.shift(board, -dx, -dy)
+            boards.append(board)
+        return boards
+
+    def around(self, board: int) -> int:
+        """与 `board` 中的子八方向相邻的位置"""
+        grown = board | self.shift(board, 1, 0) | self.shift(board, -1, 0)
+        return grown | self.shift(grown, 0, 1) | self.shift(grown, 0, -1)
+
+    def windows(self, own: int, free: int) -> tuple[int, ...]:
+        """统计每种己方子数的五连窗口个数，`free` 为己方子与空位"""
+        counts = [0] * 6
+        for dx, dy in DIRECTIONS:
+            stones = self.aligned(own, dx, dy, 4)
+            frees = self.aligned(free, dx, dy, 4)
+            valid = frees[0] & frees[1] & frees[2] & frees[3] & frees[4]
+            # 按位累加五个位置上的子数，s2 s1 s0 为三位二进制
+            s0 = s1 = s2 = 0
+            for board in stones:
+                carry = s0 & board
+                s0 ^= board
+                s2 |= s1 & carry
+                s1 ^= carry
+            counts[1] += popcount(valid & s0 & ~s1 & ~s2)
+            counts[2] += popcount(valid & ~s0 & s1 & ~s2)
+            counts[3] += popcount(valid & s0 & s1 & ~s2)
+            counts[4] += popcount(valid & ~s0 & ~s1 & s2)
+            counts[5] += popcount(valid & s0 & ~s1 & s2)
+        return tuple(counts)
+
+    def wins(self, own: int, empty: int) -> int:
+        """落子后能连成五子的空位"""
+        cells = 0
+        for dx, dy in DIRECTIONS:
+            forward = self.aligned(own, dx, dy, 4)
+            backward = self.aligned(own, -dx, -dy, 4)
+            for gap in range(5):
+                line = empty
+                for j in range(1, 5 - gap):
+                    line &= forward[j]
+                for j in range(1, gap + 1):
+                    line &= backward[j]
+                cells |= line
+        return cells
+
+
+@lru_cache
+def get_board(size: int) -> Board:
+    return Board(size)
+
+
+class Searcher:
+    def __init__(self, size: int, deadline: float):
+        self.board = get_board(size)
+        self.deadline = deadline
+        self.nodes = 0
+        self.table: dict[tuple[int, int], TableEntry] = {}
+        self.scores: dict[tuple[int, int], int] = {}
+
+    def evaluate(self, own: int, opponent: int) -> int:
+        """从轮到的一方看的局面分"""
+        key = (own, opponent)
+        score = self.scores.get(key)
+        if score is None:
+            empty = self.board.full ^ (own | opponent)
+            mine = self.board.windows(own, own | empty)
+            theirs = self.board.windows(opponent, opponent | empty)
+            score = sum(w * (m - t) for w, m, t in zip(WEIGHTS, mine, theirs))
+            self.scores[key] = score
+        return score
+
+    def candidates(self, own: int, opponent: int, empty: int, limit: int) -> list[int]:
+        """按落子后的局面分排序的候选位置"""
+        forced = self.board.wins(opponent, empty)
+        if forced:
+            return indexes(forced)[:1]
+        moves = indexes(self.board.around(own | opponent) & empty)
+        if not moves:
+            return [self.board.area // 2]
+        scored = sorted(
+            moves, key=lambda index: self.evaluate(opponent, own | 1 << index)
+        )
+        return scored[:limit]
+
+    def negamax(
+        self, own: int, opponent: int, depth: int, alpha: int, beta: int, ply: int
+    ) -> tuple[int, int]:
+        self.nodes += 1
+        if not self.nodes & 31 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        empty = self.board.full ^ (own | opponent)
+        wins = self.board.wins(own, empty)
+        if wins:
+            return WIN - ply, indexes(wins)[0]
+        if not empty:
+            return 0, -1
+        threats = self.board.wins(opponent, empty)
+        if threats & (threats - 1):
+            # 对方有两处可以连五，只能挡住一处
+            return -(WIN - ply - 1), indexes(threats)[0]
+        if depth <= 0:
+            return self.evaluate(own, opponent), -1
+
+        key = (own, opponent)
+        entry = self.table.get(key)
+        best_move = -1
+        if entry:
+            if usable(entry, depth, alpha, beta):
+                return entry[2], entry[3]
+            best_move = entry[3]
+
+        limit = BRANCHES[0] if ply == 0 else BRANCHES[1]
+        moves = self.candidates(own, opponent, empty, limit)
+        if best_move in moves:
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+        origin = alpha
+        best = -WIN - 1
+        for index in moves:
+            value, _ = self.negamax(
+                opponent, own | 1 << index, depth - 1, -beta, -alpha, ply + 1
+            )
+            value = -value
+            if value > best:
+                best, best_move = value, index
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        self.table[key] = (depth, bound(origin, beta, best), best, best_move)
+        return best, best_move
+
+
+def search(
+    size: int, b_board: int, w_board: int, moveside: int, budget: float
+) -> SearchResult:
+    """在 `budget` 秒内搜索 `moveside` 一方的落子，返回位置编号"""
+    start = time.perf_counter()
+    own, opponent = (b_board, w_board) if moveside == 1 else (w_board, b_board)
+    searcher = Searcher(size, start + budget)
+    move, score, depth = -1, 0, 0
+    try:
+        for depth in range(1, MAX_DEPTH + 1):
+            score, move = searcher.negamax(own, opponent, depth, -WIN - 1, WIN + 1, 0)
+            if abs(score) >= WIN - MAX_DEPTH:
+                break
+        else:
+            depth = MAX_DEPTH
+    except SearchTimeout:
+        depth -= 1
+    if move < 0:
+        empty = searcher.board.full ^ (own | opponent)
+        move = searcher.candidates(own, opponent, empty, 1)[0]
+    return SearchResult(move, score, depth, searcher.nodes, time.perf_counter() - start)
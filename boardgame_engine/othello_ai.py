@@ -0,0 +1,358 @@
+"""黑白棋 AI：位棋盘上带置换表与着法排序的 negamax 搜索
+
+剩余空位不多时改用精确的终局求解，开局阶段优先查询开局库。
+"""
+
+import mmap
+import struct
+import time
+from pathlib import Path
+from typing import Optional
+
+from .bitboard import (
+    SearchResult,
+    SearchTimeout,
+    TableEntry,
+    bits,
+    bound,
+    popcount,
+    usable,
+)
+
+FULL = (1 << 64) - 1
+NOT_LEFT = FULL ^ 0x0101010101010101
+"""去掉最左一列（y = 0）的掩码"""
+NOT_RIGHT = FULL ^ 0x8080808080808080
+"""去掉最右一列（y = 7）的掩码"""
+DIRECTIONS = (
+    (1, NOT_LEFT),
+    (-1, NOT_RIGHT),
+    (8, FULL),
+    (-8, FULL),
+    (9, NOT_LEFT),
+    (7, NOT_RIGHT),
+    (-7, NOT_LEFT),
+    (-9, NOT_RIGHT),
+)
+"""(位移, 位移后的掩码)，正数为左移"""
+
+CORNERS = 0x8100000000000081
+WEIGHTS = (
+    (100, 0x8100000000000081),
+    (-20, 0x4281000000008142),
+    (-50, 0x0042000000004200),
+    (10, 0x2400810000810024),
+    (5, 0x1800008181000018),
+    (-2, 0x003C424242423C00),
+    (-1, 0x00003C3C3C3C0000),
+)
+"""位置权重与对应的格子"""
+MOBILITY = 8
+"""双方可落子数之差的权重"""
+EXACT = 10_000
+"""终局时每颗子之差的分值"""
+
+ENDGAME_EMPTIES = 14
+"""剩余空位不超过此数时尝试精确求解"""
+MAX_DEPTH = 60
+
+BOOK_PATH = Path(__file__).with_name("othello_book.bin")
+BOOK_MAGIC = b"OTHBOOK1"
+BOOK_RECORD = struct.Struct("<QQB")
+"""开局库的记录：轮到的一方、对方、最佳落子，按前两项的规范形式升序排列"""
+BOOK_PLIES = 8
+"""开局库覆盖的手数"""
+
+
+def shift(board: int, offset: int, mask: int) -> int:
+    if offset > 0:
+        return (board << offset) & mask & FULL
+    return (board >> -offset) & mask
+
+
+def legal_moves(own: int, opponent: int) -> int:
+    empty = FULL ^ (own | opponent)
+    moves = 0
+    for offset, mask in DIRECTIONS:
+        temp = shift(own, offset, mask) & opponent
+        for _ in range(5):
+            temp |= shift(temp, offset, mask) & opponent
+        moves |= shift(temp, offset, mask) & empty
+    return moves
+
+
+def flips(own: int, opponent: int, bit: int) -> int:
+    diff = 0
+    for offset, mask in DIRECTIONS:
+        temp = 0
+        p = shift(bit, offset, mask)
+        while p & opponent:
+            temp |= p
+            p = shift(p, offset, mask)
+        if p & own:
+            diff |= temp
+    return diff
+
+
+def final_score(own: int, opponent: int) -> int:
+    return (popcount(own) - popcount(opponent)) * EXACT
+
+
+def evaluate(own: int, opponent: int) -> int:
+    score = 0
+    for weight, mask in WEIGHTS:
+        score += weight * (popcount(own & mask) - popcount(opponent & mask))
+    mobility = popcount(legal_moves(own, opponent))
+    mobility -= popcount(legal_moves(opponent, own))
+    return score + MOBILITY * mobility
+
+
+def flip_vertical(board: int) -> int:
+    return int.from_bytes(board.to_bytes(8, "little"), "big")
+
+
+MIRROR = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+
+def mirror(board: int) -> int:
+    return int.from_bytes(board.to_bytes(8, "little").translate(MIRROR), "little")
+
+
+def transpose(board: int) -> int:
+    temp = 0x0F0F0F0F00000000 & (board ^ (board << 28))
+    board ^= temp ^ (temp >> 28)
+    temp = 0x3333000033330000 & (board ^ (board << 14))
+    board ^= temp ^ (temp >> 14)
+    temp = 0x5500550055005500 & (board ^ (board << 7))
+    board ^= temp ^ (temp >> 7)
+    return board & FULL
+
+
+def symmetry(board: int, index: int) -> int:
+    """棋盘的 8 种对称变换，`index` 的三位分别表示转置、左右镜像、上下翻转"""
+    if index & 1:
+        board = transpose(board)
+    if index & 2:
+        board = mirror(board)
+    if index & 4:
+        board = flip_vertical(board)
+    return board
+
+
+def inverse(board: int, index: int) -> int:
+    if index & 4:
+        board = flip_vertical(board)
+    if index & 2:
+        board = mirror(board)
+    if index & 1:
+        board = transpose(board)
+    return board
+
+
+def canonical(own: int, opponent: int) -> tuple[int, int, int]:
+    """返回 8 种对称局面中最小的一个及所用的变换"""
+    return min(
+        (symmetry(own, index), symmetry(opponent, index), index) for index in range(8)
+    )
+
+
+class Book:
+    """内存映射的开局库，首次查询时才打开文件"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data: Optional[mmap.mmap] = None
+        self.count: int = 0
+        self.loaded: bool = False
+
+    def load(self):
+        self.loaded = True
+        try:
+            with self.path.open("rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        if data[: len(BOOK_MAGIC)] != BOOK_MAGIC:
+            data.close()
+            return
+        self.data = data
+        self.count = (len(data) - len(BOOK_MAGIC)) // BOOK_RECORD.size
+
+    def record(self, index: int) -> tuple[int, int, int]:
+        assert self.data
+        offset = len(BOOK_MAGIC) + index * BOOK_RECORD.size
+        return BOOK_RECORD.unpack_from(self.data, offset)
+
+    def lookup(self, own: int, opponent: int) -> int:
+        """查询轮到的一方的落子位置编号，没有则为 -1"""
+        if not self.loaded:
+            self.load()
+        if not self.data:
+            return -1
+        own_key, opponent_key, index = canonical(own, opponent)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.record(middle)[:2] < (own_key, opponent_key):
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return -1
+        own_record, opponent_record, move = self.record(low)
+        if (own_record, opponent_record) != (own_key, opponent_key):
+            return -1
+        return inverse(1 << move, index).bit_length() - 1
+
+
+book = Book(BOOK_PATH)
+
+
+class Searcher:
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.nodes = 0
+        self.table: dict[tuple[int, int], TableEntry] = {}
+        """`solve` 中的深度为剩余空位数"""
+
+    def tick(self):
+        self.nodes += 1
+        if not self.nodes & 63 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+    def order(self, own: int, opponent: int, moves: int, first: int) -> list[int]:
+        """角优先，其余按落子后对方的可落子数从少到多排序"""
+        keyed = []
+        for bit in bits(moves):
+            if bit == first:
+                key = -2
+            elif bit & CORNERS:
+                key = -1
+            else:
+                diff = flips(own, opponent, bit)
+                key = popcount(legal_moves(opponent ^ diff, own | bit | diff))
+            keyed.append((key, bit))
+        keyed.sort()
+        return [bit for _, bit in keyed]
+
+    def negamax(
+        self, own: int, opponent: int, depth: int, alpha: int, beta: int
+    ) -> tuple[int, int]:
+        self.tick()
+        moves = legal_moves(own, opponent)
+        if not moves:
+            if not legal_moves(opponent, own):
+                return final_score(own, opponent), 0
+            value, _ = self.negamax(opponent, own, depth, -beta, -alpha)
+            return -value, 0
+        if depth <= 0:
+            return evaluate(own, opponent), 0
+
+        key = (own, opponent)
+        entry = self.table.get(key)
+        best_move = 0
+        if entry:
+            if usable(entry, depth, alpha, beta):
+                return entry[2], entry[3]
+            best_move = entry[3]
+
+        if depth >= 2:
+            ordered = self.order(own, opponent, moves, best_move)
+        else:
+            ordered = bits(moves)
+        origin = alpha
+        best = -EXACT * 65
+        for bit in ordered:
+            diff = flips(own, opponent, bit)
+            value, _ = self.negamax(
+                opponent ^ diff, own | bit | diff, depth - 1, -beta, -alpha
+            )
+            value = -value
+            if value > best:
+                best, best_move = value, bit
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        self.table[key] = (depth, bound(origin, beta, best), best, best_move)
+        return best, best_move
+
+    def solve(
+        self, own: int, opponent: int, alpha: int, beta: int, empties: int
+    ) -> tuple[int, int]:
+        """精确求解终局的子数差"""
+        self.tick()
+        moves = legal_moves(own, opponent)
+        if not moves:
+            if not legal_moves(opponent, own):
+                return popcount(own) - popcount(opponent), 0
+            value, _ = self.solve(opponent, own, -beta, -alpha, empties)
+            return -value, 0
+
+        key = (own, opponent)
+        entry = self.table.get(key) if empties > 6 else None
+        first = 0
+        if entry:
+            if usable(entry, 0, alpha, beta):
+                return entry[2], entry[3]
+            first = entry[3]
+
+        if empties > 6:
+            ordered = self.order(own, opponent, moves, first)
+        else:
+            ordered = bits(moves)
+        origin = alpha
+        best, best_move = -65, 0
+        for bit in ordered:
+            diff = flips(own, opponent, bit)
+            value, _ = self.solve(
+                opponent ^ diff, own | bit | diff, -beta, -alpha, empties - 1
+            )
+            value = -value
+            if value > best:
+                best, best_move = value, bit
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if empties > 6:
+            self.table[key] = (empties, bound(origin, beta, best), best, best_move)
+        return best, best_move
+
+
+def search(
+    size: int, b_board: int, w_board: int, moveside: int, budget: float
+) -> SearchResult:
+    """在 `budget` 秒内搜索 `moveside` 一方的落子，返回位置编号，无子可下时为 -1"""
+    start = time.perf_counter()
+    own, opponent = (b_board, w_board) if moveside == 1 else (w_board, b_board)
+    moves = legal_moves(own, opponent)
+    if not moves:
+        return SearchResult(-1, 0, 0, 0, 0)
+    if not moves & (moves - 1):
+        return SearchResult(moves.bit_length() - 1, 0, 0, 0, 0)
+
+    empties = 64 - popcount(own | opponent)
+    move = book.lookup(own, opponent) if empties >= 60 - BOOK_PLIES else -1
+    if move >= 0 and moves >> move & 1:
+        return SearchResult(move, 0, 0, 0, time.perf_counter() - start)
+
+    searcher = Searcher(start + budget)
+    bit, score, depth = 0, 0, 0
+    try:
+        for depth in range(1, min(MAX_DEPTH, empties) + 1):
+            if empties <= ENDGAME_EMPTIES and depth > 4:
+                # 先用浅层搜索得到备用的落子，再尝试精确求解
+                searcher.table.clear()
+                score, bit = searcher.solve(own, opponent, -65, 65, empties)
+                score *= EXACT
+                depth = empties
+                break
+            score, bit = searcher.negamax(own, opponent, depth, -EXACT * 65, EXACT * 65)
+    except SearchTimeout:
+        depth -= 1
+    if not bit:
+        bit = moves & -moves
+    return SearchResult(
+        bit.bit_length() - 1, score, depth, searcher.nodes, time.perf_counter() - start
+    )
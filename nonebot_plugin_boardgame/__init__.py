@@ -1,36 +1,56 @@
 import asyncio
-from asyncio import TimerHandle
-from typing import Annotated, Optional, Union
+import time
+from typing import Annotated, NamedTuple, Optional, Union
 
-from nonebot import require
+from nonebot import get_driver, logger, require
+from nonebot.drivers import ASGIMixin, HTTPServerSetup, Request, Response
 from nonebot.matcher import Matcher
+from nonebot.message import event_preprocessor
 from nonebot.params import Depends
+from nonebot.permission import SUPERUSER
 from nonebot.plugin import PluginMetadata, inherit_supported_adapters
 from nonebot.rule import to_me
+from nonebot.typing import T_State
 
 require("nonebot_plugin_alconna")
 require("nonebot_plugin_uninfo")
 require("nonebot_plugin_orm")
-require("nonebot_plugin_htmlrender")
+
+from .config import Config, plugin_config
+
+if plugin_config.boardgame_renderer == "htmlrender":
+    require("nonebot_plugin_htmlrender")
 
 from nonebot_plugin_alconna import (
     Alconna,
     AlconnaQuery,
     Args,
     Image,
+    MsgTarget,
+    MultiVar,
     Option,
     Query,
+    Target,
     Text,
     UniMessage,
     on_alconna,
     store_true,
 )
 from nonebot_plugin_uninfo import Uninfo
+from yarl import URL
+
+from boardgame_engine.bitboard import popcount
 
-from .game import Game, MoveResult, Player, Pos
+from .ai import shutdown as shutdown_ai
+from .ai import think
+from .game import NULL_MOVE, Game, MoveResult, Player, Pos
 from .go import Go
 from .gomoku import Gomoku
+from .htmlpage import page_pool
+from .metrics import metrics
 from .othello import Othello
+from .persist import record_writer
+from .scheduler import TimeoutScheduler
 
 __plugin_meta__ = PluginMetadata(
     name="棋类游戏",
@@ -41,6 +61,7 @@ __plugin_meta__ = PluginMetadata(
         "发送“结束下棋”结束当前棋局；发送“显示棋盘”显示当前棋局"
     ),
     type="application",
+    config=Config,
     homepage="https://github.com/noneplugin/nonebot-plugin-boardgame",
     supported_adapters=inherit_supported_adapters(
         "nonebot_plugin_alconna", "nonebot_plugin_uninfo"
@@ -49,7 +70,74 @@ __plugin_meta__ = PluginMetadata(
 
 
 games: dict[str, Game] = {}
-timers: dict[str, TimerHandle] = {}
+"""内存中的棋局，按最近一次操作的先后排列"""
+hibernated: dict[str, type[Game]] = {}
+"""已保存到数据库并移出内存的棋局，再次操作时自动恢复"""
+hibernate_task: Optional[asyncio.Task] = None
+targets: dict[str, Target] = {}
+thinking: set[str] = set()
+"""AI 正在思考的会话"""
+
+
+class CountRequest(NamedTuple):
+    game_id: str
+    position: tuple[int, int]
+    """发起时的 (黑方, 白方) 棋盘，之后局面有变化则请求作废"""
+    player: Player
+    dead: int
+    """列为死子的位置"""
+
+
+counting: dict[str, CountRequest] = {}
+"""等待对方确认的数子请求"""
+
+driver = get_driver()
+
+
+@driver.on_startup
+async def _():
+    metrics.start_loop_monitor()
+
+
+@driver.on_shutdown
+async def _():
+    metrics.stop_loop_monitor()
+    shutdown_ai()
+    await page_pool.close()
+    await record_writer.stop()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(
+        200,
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        content=metrics.render(),
+    )
+
+
+if plugin_config.boardgame_metrics_path and isinstance(driver, ASGIMixin):
+    driver.setup_http_server(
+        HTTPServerSetup(
+            URL(plugin_config.boardgame_metrics_path),
+            "GET",
+            "boardgame_metrics",
+            metrics_endpoint,
+        )
+    )
+
+
+RECEIVED = "_boardgame_received"
+
+
+@event_preprocessor
+async def _(state: T_State):
+    # 记录收到事件的时间，处理器开始运行时的差值即为分发与指令解析的耗时
+    state[RECEIVED] = time.perf_counter()
+
+
+def observe_dispatch(state: T_State, rule: str):
+    if RECEIVED in state:
+        metrics.observe("dispatch", rule, time.perf_counter() - state[RECEIVED])
 
 
 def get_user_id(uninfo: Uninfo) -> str:
@@ -60,11 +148,87 @@ UserId = Annotated[str, Depends(get_user_id)]
 
 
 def game_is_running(user_id: UserId) -> bool:
-    return user_id in games
+    return user_id in games or user_id in hibernated
 
 
 def game_not_running(user_id: UserId) -> bool:
-    return user_id not in games
+    return user_id not in games and user_id not in hibernated
+
+
+def touch_game(user_id: str, game: Game):
+    """将棋局移到最近操作的一端，超出数量上限时在后台休眠最久未操作的棋局"""
+    global hibernate_task
+    games.pop(user_id, None)
+    games[user_id] = game
+    hibernated.pop(user_id, None)
+    if len(games) > plugin_config.boardgame_max_games and (
+        not hibernate_task or hibernate_task.done()
+    ):
+        hibernate_task = asyncio.create_task(hibernate_games())
+
+
+async def hibernate_games():
+    """保存最久未操作的棋局后将其移出内存"""
+    while (count := len(games) - plugin_config.boardgame_max_games) > 0:
+        idle = [
+            (user_id, game)
+            for user_id, game in list(games.items())[:count]
+            if user_id not in thinking
+        ]
+        if not idle:
+            return
+        for user_id, game in idle:
+            record_writer.add(game, user_id)
+        try:
+            await record_writer.flush()
+        except Exception as e:
+            logger.warning(f"休眠棋局失败：{e!r}")
+            return
+        # 保存期间被操作过或还有未保存改动的棋局留在内存中
+        oldest = set(list(games)[: len(games) - plugin_config.boardgame_max_games])
+        evicted = 0
+        for user_id, game in idle:
+            if (
+                user_id in oldest
+                and games.get(user_id) is game
+                and game.id not in record_writer.pending
+                and game.recorded
+                and game.saved_moves == game.synced_moves == len(game.moves)
+            ):
+                del games[user_id]
+                hibernated[user_id] = type(game)
+                evicted += 1
+        if not evicted:
+            return
+
+
+async def wake_game(user_id: str) -> Optional[Game]:
+    """从数据库恢复休眠的棋局"""
+    cls = hibernated[user_id]
+    with metrics.timer("load", cls.rule):
+        game = await cls.load_record(user_id)
+    # 等待期间其他指令可能已经恢复了棋局或结束了游戏
+    if user_id in games:
+        return games[user_id]
+    if user_id not in hibernated:
+        return None
+    return game
+
+
+async def current_game(user_id: UserId, state: T_State, matcher: Matcher) -> Game:
+    game = games.get(user_id)
+    if not game and user_id in hibernated:
+        game = await wake_game(user_id)
+        if not game:
+            stop_game(user_id)
+            await matcher.finish("没有找到被中断的游戏，游戏已结束")
+    assert game
+    touch_game(user_id, game)
+    observe_dispatch(state, game.rule)
+    return game
+
+
+CurrentGame = Annotated[Game, Depends(current_game)]
 
 
 boardgame = on_alconna(
@@ -72,6 +236,7 @@ boardgame = on_alconna(
         "boardgame",
         Option("-r|--rule", Args["rule", str], help_text="棋局规则"),
         Option("--white", default=False, action=store_true, help_text="执白，即后手"),
+        Option("--ai", default=False, action=store_true, help_text="人机对局"),
     ),
     rule=to_me() & game_not_running,
     use_cmd_start=True,
@@ -83,23 +248,25 @@ boardgame = on_alconna(
 def boardgame_wrapper(slot: Union[int, str], content: Optional[str]) -> str:
     if slot == "order" and content in ("后手", "执白"):
         return "--white"
+    if slot == "mode" and content == "人机":
+        return "--ai"
     return ""
 
 
 boardgame.shortcut(
-    r"五子棋(?P<order>先手|执白|后手|执黑)?",
+    r"五子棋(?P<mode>人机)?(?P<order>先手|执白|后手|执黑)?",
     {
         "prefix": True,
         "wrapper": boardgame_wrapper,
-        "args": ["--rule", "gomoku", "{order}"],
+        "args": ["--rule", "gomoku", "{mode}", "{order}"],
     },
 )
 boardgame.shortcut(
-    r"(?:黑白棋|奥赛罗)(?P<order>先手|执白|后手|执黑)?",
+    r"(?:黑白棋|奥赛罗)(?P<mode>人机)?(?P<order>先手|执白|后手|执黑)?",
     {
         "prefix": True,
         "wrapper": boardgame_wrapper,
-        "args": ["--rule", "othello", "{order}"],
+        "args": ["--rule", "othello", "{mode}", "{order}"],
     },
 )
 boardgame.shortcut(
@@ -112,7 +279,15 @@ boardgame.shortcut(
 )
 
 boardgame_show = on_alconna(
-    "显示棋盘",
+    Alconna(
+        "显示棋盘",
+        Option(
+            "-l|--legal",
+            default=False,
+            action=store_true,
+            help_text="标出轮到的一方所有可以落子的位置",
+        ),
+    ),
     aliases={"显示棋局", "查看棋盘", "查看棋局"},
     rule=game_is_running,
     use_cmd_start=True,
@@ -142,6 +317,35 @@ boardgame_skip = on_alconna(
     block=True,
     priority=13,
 )
+boardgame_count = on_alconna(
+    Alconna("数子", Args["dead", MultiVar(str, "*")]),
+    rule=game_is_running,
+    use_cmd_start=True,
+    block=True,
+    priority=13,
+)
+boardgame_hint = on_alconna(
+    "提示",
+    aliases={"落子提示"},
+    rule=game_is_running,
+    use_cmd_start=True,
+    block=True,
+    priority=13,
+)
+boardgame_count_accept = on_alconna(
+    "同意数子",
+    rule=game_is_running,
+    use_cmd_start=True,
+    block=True,
+    priority=13,
+)
+boardgame_count_reject = on_alconna(
+    "拒绝数子",
+    rule=game_is_running,
+    use_cmd_start=True,
+    block=True,
+    priority=13,
+)
 
 boardgame_reload = on_alconna(
     Alconna(
@@ -184,29 +388,44 @@ boardgame_position = on_alconna(
     priority=14,
 )
 
+boardgame_stats = on_alconna(
+    Alconna(
+        "棋局统计",
+        Option("-p|--prometheus", default=False, action=store_true),
+    ),
+    permission=SUPERUSER,
+    use_cmd_start=True,
+    block=True,
+    priority=13,
+)
+
 
 def stop_game(user_id: str):
-    if timer := timers.pop(user_id, None):
-        timer.cancel()
+    timeouts.cancel(user_id)
+    targets.pop(user_id, None)
+    counting.pop(user_id, None)
     games.pop(user_id, None)
+    hibernated.pop(user_id, None)
 
 
-async def stop_game_timeout(matcher: Matcher, user_id: str):
-    game = games.get(user_id, None)
+async def stop_game_timeout(user_id: str):
+    game = games.get(user_id, None) or hibernated.get(user_id, None)
+    target = targets.get(user_id, None)
     stop_game(user_id)
-    if game:
+    if game and target:
         msg = f"{game.name}下棋超时，游戏结束，可发送“重载{game.name}棋局”继续下棋"
-        await matcher.finish(msg)
+        await UniMessage.text(msg).send(target)
+
 
+timeouts = TimeoutScheduler(stop_game_timeout)
 
-def set_timeout(matcher: Matcher, user_id: str, timeout: float = 600):
-    if timer := timers.get(user_id, None):
-        timer.cancel()
-    loop = asyncio.get_running_loop()
-    timer = loop.call_later(
-        timeout, lambda: asyncio.ensure_future(stop_game_timeout(matcher, user_id))
+
+def set_timeout(user_id: str, target: Target, game: Game):
+    targets[user_id] = target
+    timeout = plugin_config.boardgame_timeout_rules.get(
+        game.rule, plugin_config.boardgame_timeout
     )
-    timers[user_id] = timer
+    timeouts.set(user_id, timeout)
 
 
 def current_player(uninfo: Uninfo) -> Player:
@@ -223,14 +442,97 @@ def current_player(uninfo: Uninfo) -> Player:
 CurrentPlayer = Annotated[Player, Depends(current_player)]
 
 
+def is_participant(game: Game, player: Player) -> bool:
+    return any(
+        seat and seat == player for seat in (game.player_black, game.player_white)
+    )
+
+
+async def draw(game: Game, marks: tuple[int, int] = (0, 0)) -> bytes:
+    with metrics.timer("draw", game.rule):
+        return await game.draw(marks)
+
+
+async def send(game: Game, msg: UniMessage):
+    with metrics.timer("send", game.rule):
+        await msg.send()
+
+
+def describe_result(
+    user_id: str, game: Game, result: Optional[MoveResult], player: Player
+) -> str:
+    """落子结果的描述，对局结束时同时结束游戏"""
+    if result == MoveResult.SKIP:
+        return f"，下一手依然轮到 {player}\n"
+    if result:
+        game.is_game_over = True
+        stop_game(user_id)
+        if result == MoveResult.BLACK_WIN:
+            return f"，恭喜 {game.player_black} 获胜！\n"
+        if result == MoveResult.WHITE_WIN:
+            return f"，恭喜 {game.player_white} 获胜！\n"
+        return "，本局游戏平局\n"
+    if game.player_next:
+        return f"，下一手轮到 {game.player_next}\n"
+    return ""
+
+
+async def ai_reply(user_id: str, game: Game, result: Optional[MoveResult]) -> str:
+    """人机对局中由 AI 落子，直到轮到玩家或对局结束，返回描述 AI 落子的文字"""
+    msg = ""
+    while not game.is_game_over:
+        if result == MoveResult.SKIP:
+            # 无子可下的一方自动跳过
+            game.update(Pos.null())
+        ai = game.player_next
+        if not (ai and ai.is_ai):
+            break
+        moves = len(game.moves)
+        thinking.add(user_id)
+        try:
+            with metrics.timer("ai", game.rule):
+                search = await think(game)
+        except Exception as e:
+            logger.warning(f"机器人思考失败：{e!r}")
+            if games.get(user_id) is not game or len(game.moves) != moves:
+                break
+            # 撤回到玩家的回合，以便重新落子
+            while game.moves and game.ai_turn:
+                game.pop()
+            if game.ai_turn:
+                msg += "机器人出错了，请发送“结束下棋”后重新开始\n"
+            else:
+                msg += "机器人出错了，已撤回到你的回合，请重新落子\n"
+            break
+        finally:
+            thinking.discard(user_id)
+        # 思考期间对局被结束或改动时放弃这一手
+        if games.get(user_id) is not game or len(game.moves) != moves:
+            break
+        pos = game.decode(search.move) if search.move >= 0 else Pos.null()
+        with metrics.timer("update", game.rule):
+            result = game.update(pos)
+        if game.in_range(pos):
+            msg += f"{ai} 落子于 {pos}"
+        else:
+            # AI 无子可下，轮到玩家
+            result = None
+            msg += f"{ai} 跳过回合"
+        msg += describe_result(user_id, game, result, ai)
+    return msg
+
+
 @boardgame.handle()
 async def _(
     matcher: Matcher,
     user_id: UserId,
+    target: MsgTarget,
     uninfo: Uninfo,
     player: CurrentPlayer,
+    state: T_State,
     rule: Query[str] = AlconnaQuery("rule", ""),
     white: Query[bool] = AlconnaQuery("white.value", False),
+    ai: Query[bool] = AlconnaQuery("ai.value", False),
 ):
     if uninfo.scene.is_private:
         await matcher.finish("棋类游戏暂不支持私聊")
@@ -246,32 +548,55 @@ async def _(
             "当前支持的规则：go（围棋）、gomoku（五子棋）、othello（黑白棋）"
         )
 
+    if ai.result and Game.ai_search is None:
+        await matcher.finish(f"{Game.name}暂不支持人机对局")
+
+    observe_dispatch(state, Game.rule)
     game = Game()
     if white.result:
         game.player_white = player
+        if ai.result:
+            game.player_black = Player.ai()
     else:
         game.player_black = player
+        if ai.result:
+            game.player_white = Player.ai()
 
-    games[user_id] = game
-    set_timeout(matcher, user_id)
-    await game.save_record(user_id)
+    touch_game(user_id, game)
+    set_timeout(user_id, target, game)
 
     msg = f"{player} 发起了游戏 {game.name}！\n发送“落子 字母+数字”下棋，如“落子 A1”"
-    await (Text(msg) + Image(raw=await game.draw())).send()
+    if game.ai_turn:
+        msg += "\n" + await ai_reply(user_id, game, None)
+    record_writer.add(game, user_id)
+    await send(game, Text(msg) + Image(raw=await draw(game)))
 
 
 @boardgame_show.handle()
-async def _(matcher: Matcher, user_id: UserId):
-    game = games[user_id]
-    set_timeout(matcher, user_id)
+async def _(
+    matcher: Matcher,
+    user_id: UserId,
+    target: MsgTarget,
+    game: CurrentGame,
+    legal: Query[bool] = AlconnaQuery("legal.value", False),
+):
+    set_timeout(user_id, target, game)
 
-    await UniMessage.image(raw=await game.draw()).send()
+    if not legal.result:
+        await send(game, UniMessage.image(raw=await draw(game)))
+        return
+    if not isinstance(game, (Go, Othello)):
+        await matcher.finish(f"{game.name}不支持标出可以落子的位置")
+    moves = game.legal_moves(game.moveside)
+    # 以轮到一方的颜色标出
+    marks = (moves, 0) if game.moveside == 1 else (0, moves)
+    await send(game, UniMessage.image(raw=await draw(game, marks)))
 
 
 @boardgame_stop.handle()
-async def _(matcher: Matcher, user_id: UserId, player: CurrentPlayer):
-    game = games[user_id]
-
+async def _(
+    matcher: Matcher, user_id: UserId, player: CurrentPlayer, game: CurrentGame
+):
     if (not game.player_white or game.player_white != player) and (
         not game.player_black or game.player_black != player
     ):
@@ -280,42 +605,224 @@ async def _(matcher: Matcher, user_id: UserId, player: CurrentPlayer):
     await matcher.finish(f"游戏已结束，可发送“重载{game.name}棋局”继续下棋")
 
 
+def count_result(game: Go, dead: int) -> tuple[str, MoveResult, tuple[int, int]]:
+    """按数子法计算胜负，返回子数的描述、结果与 (黑方, 白方) 的归属标记"""
+    with metrics.timer("update", game.rule):
+        black, white = game.territory(dead)
+    # 只标出空点与死子的归属
+    marks = (black & ~game.b_board, white & ~game.w_board)
+    b_count = popcount(black)
+    w_count = popcount(white)
+    if b_count - w_count > game.komi:
+        result = MoveResult.BLACK_WIN
+    elif b_count - w_count < game.komi:
+        result = MoveResult.WHITE_WIN
+    else:
+        result = MoveResult.DRAW
+    msg = f"黑方 {b_count} 子，白方 {w_count} 子，黑方贴 {game.komi:g} 目"
+    return msg, result, marks
+
+
+async def current_count_request(
+    matcher: Matcher, user_id: UserId, player: CurrentPlayer, game: CurrentGame
+) -> CountRequest:
+    request = counting.get(user_id)
+    if (
+        not request
+        or request.game_id != game.id
+        or request.position != (game.b_board, game.w_board)
+    ):
+        counting.pop(user_id, None)
+        await matcher.finish("没有等待确认的数子")
+    if not is_participant(game, player):
+        await matcher.finish("只有游戏参与者才能确认数子")
+    if request.player == player:
+        await matcher.finish("需要由对方确认数子")
+    del counting[user_id]
+    return request
+
+
+CurrentCountRequest = Annotated[CountRequest, Depends(current_count_request)]
+
+
+@boardgame_count.handle()
+async def _(
+    matcher: Matcher,
+    user_id: UserId,
+    target: MsgTarget,
+    player: CurrentPlayer,
+    game: CurrentGame,
+    dead: Query[tuple[str, ...]] = AlconnaQuery("dead", ()),
+):
+    set_timeout(user_id, target, game)
+
+    if not isinstance(game, Go):
+        await matcher.finish(f"{game.name}不支持数子")
+    if not is_participant(game, player):
+        await matcher.finish("只有游戏参与者才能数子")
+    if game.player_black and game.player_black == player:
+        opponent = game.player_white
+    else:
+        opponent = game.player_black
+    if not opponent:
+        await matcher.finish("对手尚未加入，无法数子")
+
+    dead_stones = 0
+    for position in dead.result:
+        try:
+            pos = Pos.from_str(position)
+        except ValueError:
+            await matcher.finish(f"请发送正确的坐标：{position}")
+        if not game.in_range(pos) or not game.get(pos):
+            await matcher.finish(f"{pos} 处没有棋子")
+        board = game.b_board if game.get(pos) == 1 else game.w_board
+        dead_stones |= game.group(board, game.bit(pos))
+
+    counting[user_id] = CountRequest(
+        game.id, (game.b_board, game.w_board), player, dead_stones
+    )
+    count, _, marks = count_result(game, dead_stones)
+    msg = (
+        f"{player} 发起数子：{count}\n"
+        f"请 {opponent} 发送“同意数子”结束对局，或发送“拒绝数子”继续下棋"
+    )
+    await send(game, Text(msg) + Image(raw=await draw(game, marks)))
+
+
+@boardgame_count_accept.handle()
+async def _(
+    user_id: UserId,
+    target: MsgTarget,
+    player: CurrentPlayer,
+    game: CurrentGame,
+    request: CurrentCountRequest,
+):
+    set_timeout(user_id, target, game)
+
+    assert isinstance(game, Go)
+    count, result, marks = count_result(game, request.dead)
+    msg = f"{player} 同意了数子：{count}"
+    msg += describe_result(user_id, game, result, player)
+    record_writer.add(game, user_id)
+    await send(game, Text(msg) + Image(raw=await draw(game, marks)))
+
+
+@boardgame_count_reject.handle()
+async def _(
+    matcher: Matcher,
+    user_id: UserId,
+    target: MsgTarget,
+    player: CurrentPlayer,
+    game: CurrentGame,
+    request: CurrentCountRequest,
+):
+    set_timeout(user_id, target, game)
+
+    await matcher.finish(f"{player} 拒绝了数子，请继续下棋")
+
+
 @boardgame_repent.handle()
-async def _(matcher: Matcher, user_id: UserId, player: CurrentPlayer):
-    game = games[user_id]
-    set_timeout(matcher, user_id)
+async def _(
+    matcher: Matcher,
+    user_id: UserId,
+    target: MsgTarget,
+    player: CurrentPlayer,
+    game: CurrentGame,
+):
+    set_timeout(user_id, target, game)
 
-    if len(game.history) <= 1:
+    if user_id in thinking:
+        await matcher.finish("机器人正在思考，请稍候")
+    if not game.moves:
         await matcher.finish("对局尚未开始")
-    if game.player_last and game.player_last != player:
-        await matcher.finish("上一手棋不是你所下")
-    game.pop()
-    await game.save_record(user_id)
+    if game.has_ai:
+        if not is_participant(game, player):
+            await matcher.finish("上一手棋不是你所下")
+        # 黑方先行，玩家的落子位于偶数或奇数手，跳过不算
+        first = 0 if game.player_black and game.player_black == player else 1
+        if all(move == NULL_MOVE for move in game.moves[first::2]):
+            await matcher.finish("上一手棋不是你所下")
+        # 连同 AI 的应手一起撤回，直到轮到玩家
+        with metrics.timer("update", game.rule):
+            game.pop()
+            while game.moves and game.player_next != player:
+                game.pop()
+    else:
+        if game.player_last and game.player_last != player:
+            await matcher.finish("上一手棋不是你所下")
+        with metrics.timer("update", game.rule):
+            game.pop()
     msg = f"{player} 进行了悔棋"
-    await (Text(msg) + Image(raw=await game.draw())).send()
+    if game.has_ai:
+        msg += "\n" + await ai_reply(user_id, game, None)
+    record_writer.add(game, user_id)
+    await send(game, Text(msg) + Image(raw=await draw(game)))
 
 
 @boardgame_skip.handle()
-async def _(matcher: Matcher, user_id: UserId, player: CurrentPlayer):
-    game = games[user_id]
-    set_timeout(matcher, user_id)
+async def _(
+    matcher: Matcher,
+    user_id: UserId,
+    target: MsgTarget,
+    player: CurrentPlayer,
+    game: CurrentGame,
+):
+    set_timeout(user_id, target, game)
 
     if not game.allow_skip:
         await matcher.finish("当前游戏不允许跳过回合")
     if game.player_next and game.player_next != player:
         await matcher.finish("当前不是你的回合")
-    game.update(Pos.null())
-    await game.save_record(user_id)
+    with metrics.timer("update", game.rule):
+        game.update(Pos.null())
     msg = f"{player} 选择跳过其回合"
     if game.player_next:
         msg += f"，下一手轮到 {game.player_next}"
-    await (Text(msg) + Image(raw=await game.draw())).send()
+    if game.has_ai:
+        msg += "\n" + await ai_reply(user_id, game, None)
+    record_writer.add(game, user_id)
+    await send(game, Text(msg) + Image(raw=await draw(game)))
+
+
+@boardgame_hint.handle()
+async def _(
+    matcher: Matcher,
+    user_id: UserId,
+    target: MsgTarget,
+    player: CurrentPlayer,
+    game: CurrentGame,
+):
+    set_timeout(user_id, target, game)
+
+    if game.ai_search is None:
+        await matcher.finish(f"{game.name}暂不支持落子提示")
+    if user_id in thinking:
+        await matcher.finish("机器人正在思考，请稍候")
+    if game.player_next and game.player_next != player:
+        await matcher.finish("当前不是你的回合")
+    moves = len(game.moves)
+    thinking.add(user_id)
+    try:
+        with metrics.timer("ai", game.rule):
+            search = await think(game)
+    except Exception as e:
+        logger.warning(f"机器人思考失败：{e!r}")
+        await matcher.finish("机器人出错了，请稍后再试")
+    finally:
+        thinking.discard(user_id)
+    if games.get(user_id) is not game or len(game.moves) != moves:
+        await matcher.finish()
+    if search.move < 0:
+        await matcher.finish("当前无子可下，请跳过回合")
+    await matcher.finish(f"推荐落子于 {game.decode(search.move)}")
 
 
 @boardgame_reload.handle()
 async def _(
     matcher: Matcher,
     user_id: UserId,
+    target: MsgTarget,
+    state: T_State,
     rule: Query[str] = AlconnaQuery("rule", ""),
 ):
     if rule.result == "go":
@@ -329,11 +836,13 @@ async def _(
             "当前支持的规则：go（围棋）、gomoku（五子棋）、othello（黑白棋）"
         )
 
-    game = await Game.load_record(user_id)
+    observe_dispatch(state, Game.rule)
+    with metrics.timer("load", Game.rule):
+        game = await Game.load_record(user_id)
     if not game:
         await matcher.finish("没有找到被中断的游戏")
-    games[user_id] = game
-    set_timeout(matcher, user_id)
+    touch_game(user_id, game)
+    set_timeout(user_id, target, game)
 
     msg = (
         f"游戏发起时间：{game.start_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
@@ -341,18 +850,22 @@ async def _(
         f"白方：{game.player_white}\n"
         f"下一手轮到：{game.player_next}"
     )
-    await (Text(msg) + Image(raw=await game.draw())).send()
+    if game.ai_turn:
+        msg += "\n" + await ai_reply(user_id, game, None)
+        record_writer.add(game, user_id)
+    await send(game, Text(msg) + Image(raw=await draw(game)))
 
 
 @boardgame_position.handle()
 async def _(
     matcher: Matcher,
     user_id: UserId,
+    target: MsgTarget,
     player: CurrentPlayer,
+    game: CurrentGame,
     position: Query[str] = AlconnaQuery("position", ""),
 ):
-    game = games[user_id]
-    set_timeout(matcher, user_id)
+    set_timeout(user_id, target, game)
 
     if (
         game.player_black
@@ -379,7 +892,8 @@ async def _(
         await matcher.finish("此处已有落子")
 
     try:
-        result = game.update(pos)
+        with metrics.timer("update", game.rule):
+            result = game.update(pos)
     except ValueError as e:
         await matcher.finish(f"非法落子：{e}")
 
@@ -395,21 +909,17 @@ async def _(
 
     if result == MoveResult.ILLEGAL:
         await matcher.finish("非法落子")
-    elif result == MoveResult.SKIP:
-        msg += f"，下一手依然轮到 {player}\n"
-    elif result:
-        game.is_game_over = True
-        stop_game(user_id)
-        if result == MoveResult.BLACK_WIN:
-            msg += f"，恭喜 {game.player_black} 获胜！\n"
-        elif result == MoveResult.WHITE_WIN:
-            msg += f"，恭喜 {game.player_white} 获胜！\n"
-        elif result == MoveResult.DRAW:
-            msg += "，本局游戏平局\n"
-    else:
-        if game.player_next:
-            msg += f"，下一手轮到 {game.player_next}\n"
-    msg += Image(raw=await game.draw())
+    msg += describe_result(user_id, game, result, player)
+    if game.has_ai:
+        msg += await ai_reply(user_id, game, result)
+    msg += Image(raw=await draw(game))
+
+    record_writer.add(game, user_id)
+    await send(game, msg)
+
 
-    await game.save_record(user_id)
-    await msg.send()
+@boardgame_stats.handle()
+async def _(prometheus: Query[bool] = AlconnaQuery("prometheus.value", False)):
+    if prometheus.result:
+        await boardgame_stats.finish(metrics.render())
+    await boardgame_stats.finish(metrics.summary())
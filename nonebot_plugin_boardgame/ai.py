@@ -0,0 +1,60 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Optional
+
+from boardgame_engine.bitboard import SearchResult
+
+from .config import plugin_config
+
+if TYPE_CHECKING:
+    from .game import Game
+
+
+executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global executor
+    if executor is None:
+        # 多线程的进程中 fork 并不安全，子进程改为重新启动解释器。
+        # 搜索函数位于 `boardgame_engine`，子进程不会导入插件，
+        # 但仍会导入机器人的入口脚本，见 README 中 `boardgame_ai_workers` 的说明
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        executor = ProcessPoolExecutor(
+            max_workers=plugin_config.boardgame_ai_workers,
+            mp_context=multiprocessing.get_context(method),
+        )
+    return executor
+
+
+async def think(game: "Game") -> SearchResult:
+    """在进程池中为轮到的一方搜索落子"""
+    if game.ai_search is None:
+        raise ValueError(f"{game.name}不支持人机对局")
+    loop = asyncio.get_running_loop()
+    pool = get_executor()
+    try:
+        return await loop.run_in_executor(
+            pool,
+            game.ai_search,
+            game.size,
+            game.b_board,
+            game.w_board,
+            game.moveside,
+            plugin_config.boardgame_ai_time,
+        )
+    except BrokenProcessPool:
+        # 子进程意外退出后进程池无法继续使用，下次调用时重新创建
+        if executor is pool:
+            shutdown()
+        raise
+
+
+def shutdown():
+    global executor
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Optional
+
+from .config import plugin_config
+
+
+class ImageCache:
+    """按字节数限制容量的 LRU 图片缓存"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.images: OrderedDict[Hashable, bytes] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        image = self.images.get(key)
+        if image is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.images.move_to_end(key)
+        return image
+
+    def put(self, key: Hashable, image: bytes):
+        if len(image) > self.max_size:
+            return
+        if (old := self.images.pop(key, None)) is not None:
+            self.size -= len(old)
+        self.images[key] = image
+        self.size += len(image)
+        while self.size > self.max_size:
+            _, evicted = self.images.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self):
+        self.images.clear()
+        self.size = 0
+
+
+image_cache = ImageCache(plugin_config.boardgame_image_cache_size)
@@ -0,0 +1,28 @@
+from typing import Literal, Optional
+
+from nonebot import get_plugin_config
+from pydantic import BaseModel
+
+
+class Config(BaseModel):
+    boardgame_renderer: Literal["pillow", "htmlrender"] = "pillow"
+    """棋盘渲染方式，`pillow` 直接绘制图片，`htmlrender` 使用浏览器渲染 SVG"""
+    boardgame_image_cache_size: int = 32 * 1024 * 1024
+    """棋盘图片缓存的容量，单位为字节，设为 0 则不缓存"""
+    boardgame_render_concurrency: int = 2
+    """同时进行的棋盘渲染数量上限"""
+    boardgame_timeout: float = 600
+    """棋局超时时间，单位为秒"""
+    boardgame_timeout_rules: dict[str, float] = {}
+    """按规则单独设置的超时时间，如 `{"go": 1800}`"""
+    boardgame_max_games: int = 100
+    """内存中保留的棋局数量上限，超出时最久未操作的棋局保存到数据库后移出内存"""
+    boardgame_ai_time: float = 3
+    """人机对局中 AI 每一手的思考时间，单位为秒"""
+    boardgame_ai_workers: int = 1
+    """运行 AI 搜索的进程数"""
+    boardgame_metrics_path: Optional[str] = None
+    """以 Prometheus 文本格式提供统计数据的 HTTP 路径，如 `/boardgame/metrics`"""
+
+
+plugin_config = get_plugin_config(Config)
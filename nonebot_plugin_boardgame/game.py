@@ -1,16 +1,31 @@
+import asyncio
 import re
 import uuid
-from dataclasses import dataclass
+from array import array
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Callable, Optional, cast
 
-from nonebot_plugin_htmlrender import html_to_pic
 from nonebot_plugin_orm import get_session
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import Self
 
-from .model import GameRecord
-from .svg import Svg, SvgOptions
+from boardgame_engine.bitboard import Grid
+
+from .cache import image_cache
+from .config import plugin_config
+from .htmlpage import STONES_ID, page_pool
+from .image import draw_board
+from .metrics import metrics
+from .model import GameMove, GameRecord
+from .persist import record_writer
+from .render import render_scheduler
+from .svg import Svg, SvgOptions, Tag
+
+if TYPE_CHECKING:
+    from boardgame_engine.bitboard import SearchResult
 
 
 class MoveResult(Enum):
@@ -26,11 +41,23 @@ class Placement(Enum):
     GRID = 1
 
 
+AI_PLAYER_ID = "boardgame_ai"
+"""人机对局中 AI 一方的玩家 id"""
+
+
 class Player:
     def __init__(self, id: str, name: str):
         self.id = id
         self.name = name
 
+    @classmethod
+    def ai(cls) -> "Player":
+        return cls(AI_PLAYER_ID, "机器人")
+
+    @property
+    def is_ai(self) -> bool:
+        return self.id == AI_PLAYER_ID
+
     def __eq__(self, player: "Player") -> bool:
         return self.id == player.id
 
@@ -38,15 +65,48 @@ class Player:
         return self.name
 
 
-@dataclass
 class Pos:
+    """棋盘坐标，不可变；常用范围内的坐标会被复用"""
+
+    __slots__ = ("x", "y", "label")
+
     x: int
     y: int
+    label: str
+
+    def __new__(cls, x: int, y: int) -> Self:
+        interned = _interned.get((x, y))
+        if interned is not None:
+            return cast(Self, interned)
+        pos = object.__new__(cls)
+        object.__setattr__(pos, "x", x)
+        object.__setattr__(pos, "y", y)
+        label = "null" if x < 0 or y < 0 else chr(x + ord("A")) + str(y + 1)
+        object.__setattr__(pos, "label", label)
+        return pos
+
+    def __setattr__(self, name: str, value: object):
+        raise AttributeError("Pos 不可修改")
+
+    def __reduce__(self):
+        return Pos, (self.x, self.y)
+
+    def __eq__(self, pos: object) -> bool:
+        return isinstance(pos, Pos) and self.x == pos.x and self.y == pos.y
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
+    def __repr__(self) -> str:
+        return f"Pos(x={self.x}, y={self.y})"
 
     @classmethod
     def from_str(cls, s: str) -> "Pos":
         if s == "null":
             return cls.null()
+        pos = _labels.get(s.lower())
+        if pos is not None:
+            return pos
         match_obj = re.fullmatch(r"([a-z])(\d+)", s, re.IGNORECASE)
         if match_obj:
             x = (ord(match_obj.group(1).lower()) - ord("a")) % 32
@@ -59,20 +119,119 @@ class Pos:
         return cls(-1, -1)
 
     def __str__(self) -> str:
-        if self.x < 0 or self.y < 0:
-            return "null"
-        return chr(self.x + ord("A")) + str(self.y + 1)
+        return self.label
+
+
+_interned: dict[tuple[int, int], Pos] = {}
+_interned.update(((x, y), Pos(x, y)) for x in range(32) for y in range(32))
+_labels: dict[str, Pos] = {
+    pos.label.lower(): pos for (x, _), pos in _interned.items() if x < 26
+}
+"""字母开头的坐标文本，与 `from_str` 的正则接受的范围一致"""
+_interned[(-1, -1)] = Pos(-1, -1)
+
+
+class BoardTables:
+    """按棋盘大小预先计算的坐标表，下标为位置编号 `x * size + y`"""
+
+    __slots__ = ("points", "bits", "neighbors", "labels")
+
+    def __init__(self, size: int):
+        area = size * size
+        self.points: tuple[Pos, ...] = tuple(
+            Pos(*divmod(index, size)) for index in range(area)
+        )
+        self.bits: tuple[int, ...] = tuple(1 << index for index in range(area))
+        self.labels: tuple[str, ...] = tuple(pos.label for pos in self.points)
+        neighbors = []
+        for pos in self.points:
+            mask = 0
+            for x, y in (
+                (pos.x - 1, pos.y),
+                (pos.x + 1, pos.y),
+                (pos.x, pos.y - 1),
+                (pos.x, pos.y + 1),
+            ):
+                if 0 <= x < size and 0 <= y < size:
+                    mask |= 1 << (x * size + y)
+            neighbors.append(mask)
+        self.neighbors: tuple[int, ...] = tuple(neighbors)
+        """上下左右相邻位置的掩码，不含该位置本身"""
+
+
+@lru_cache
+def board_tables(size: int) -> BoardTables:
+    return BoardTables(size)
 
 
-@dataclass
 class History:
-    b_board: int
-    w_board: int
-    moveside: int
+    __slots__ = ("b_board", "w_board", "moveside")
+
+    def __init__(self, b_board: int, w_board: int, moveside: int):
+        self.b_board = b_board
+        self.w_board = w_board
+        self.moveside = moveside
+
+
+@lru_cache
+def draw_static_svg(size: int, placement: Placement) -> str:
+    """绘制棋盘的网格、坐标与星位，返回序列化后的 SVG 片段"""
+    view_size = size + (3 if placement == Placement.CROSS else 4)
+    line_group = Tag("g").attr(
+        {
+            "stroke": "black",
+            "stroke-width": 0.08,
+            "stroke-linecap": "round",
+        }
+    )
+
+    text_group = Tag("g").attr(
+        {
+            "font-size": "0.6",
+            "font-weight": "normal",
+            "style": "font-family: Sans; letter-spacing: 0",
+        }
+    )
+
+    top_text_group = text_group.g({"text-anchor": "middle"})
+    left_text_group = text_group.g({"text-anchor": "end"})
+    bottom_text_group = text_group.g({"text-anchor": "middle"})
+    right_text_group = text_group.g({"text-anchor": "start"})
+
+    vertical_offset = 0.3 if placement == Placement.CROSS else 0.8
+    horizontal_offset = 0 if placement == Placement.CROSS else 0.5
+    for index in range(2, view_size - 1):
+        line_group.line(index, 2, index, view_size - 2)
+        line_group.line(2, index, view_size - 2, index)
+        if index < size + 2:
+            top_text_group.text(str(index - 1), index + horizontal_offset, 1.3)
+            left_text_group.text(chr(index + 63), 1.3, index + vertical_offset)
+            bottom_text_group.text(
+                str(index - 1), index + horizontal_offset, view_size - 0.8
+            )
+            right_text_group.text(
+                chr(index + 63), view_size - 1.3, index + vertical_offset
+            )
+
+    if size >= 13 and size % 2 == 1:
+        stars = (3, size // 2, size - 4)
+        for i in stars:
+            for j in stars:
+                line_group.circle(j + 2, i + 2, 0.08)
+    return line_group.outer() + text_group.outer()
+
 
+CHECKPOINT_INTERVAL = 20
+"""每隔多少手保存一次局面快照"""
+NULL_MOVE = 0xFFFF
+"""跳过回合在 `moves` 中的编码"""
 
-class Game:
+
+class Game(Grid):
     name: str = ""
+    rule: str = ""
+    ai_search: Optional[Callable[[int, int, int, int, float], "SearchResult"]] = None
+    """人机对局使用的搜索函数，需可在进程池中调用，为 None 时不支持人机对局"""
 
     def __init__(
         self,
@@ -81,7 +240,7 @@ class Game:
         allow_skip: bool = False,
         allow_repent: bool = True,
     ):
-        self.size: int = size
+        super().__init__(size)
         self.placement: Placement = placement
         self.allow_skip: bool = allow_skip
         self.allow_repent: bool = allow_repent
@@ -90,17 +249,28 @@ class Game:
         self.start_time = datetime.now()
         self.update_time = datetime.now()
         self.is_game_over: bool = False
+        self.recorded: bool = False
+        """数据库中是否已有对局记录"""
+        self.saved_moves: int = 0
+        """数据库中已记录的落子数"""
+        self.synced_moves: int = 0
+        """与数据库中记录一致的落子数，悔棋后会小于 `saved_moves`"""
         self.player_white: Optional[Player] = None
         self.player_black: Optional[Player] = None
 
         self.moveside: int = 1
         """1 代表黑方，-1 代表白方"""
-        self.positions: list[Pos] = []
-        self.history: list[History] = []
+        self.moves: "array[int]" = array("H")
+        """所有落子位置的编号，跳过为 `NULL_MOVE`"""
+        self.snapshots: dict[int, History] = {}
+        """局面快照，键为落子数，悔棋时从最近的快照重放"""
         self.b_board: int = 0
         self.w_board: int = 0
-        self.area: int = self.size * self.size
-        self.full: int = (1 << self.area) - 1
+        tables = board_tables(self.size)
+        self.points: tuple[Pos, ...] = tables.points
+        self.bits: tuple[int, ...] = tables.bits
+        self.neighbors: tuple[int, ...] = tables.neighbors
+        self.labels: tuple[str, ...] = tables.labels
         self.save()
 
     def update(self, pos: Pos) -> Optional[MoveResult]:
@@ -114,11 +284,21 @@ class Game:
     def player_last(self) -> Optional[Player]:
         return self.player_white if self.moveside == 1 else self.player_black
 
+    @property
+    def has_ai(self) -> bool:
+        return any(
+            player and player.is_ai for player in (self.player_black, self.player_white)
+        )
+
+    @property
+    def ai_turn(self) -> bool:
+        return bool(self.player_next and self.player_next.is_ai)
+
     def is_full(self):
         return not ((self.b_board | self.w_board) ^ self.full)
 
     def bit(self, pos: Pos) -> int:
-        return 1 << (pos.x * self.size + pos.y)
+        return self.bits[pos.x * self.size + pos.y]
 
     def in_range(self, pos: Pos) -> bool:
         return pos.x >= 0 and pos.y >= 0 and pos.x < self.size and pos.y < self.size
@@ -143,47 +323,121 @@ class Game:
             self.w_board &= ~bit
             self.b_board &= ~bit
 
+    def encode(self, pos: Pos) -> int:
+        return pos.x * self.size + pos.y if self.in_range(pos) else NULL_MOVE
+
+    def decode(self, move: int) -> Pos:
+        if move == NULL_MOVE:
+            return Pos.null()
+        return self.points[move]
+
+    @property
+    def positions(self) -> list[Pos]:
+        return [self.decode(move) for move in self.moves]
+
     def push(self, pos: Pos):
         if self.in_range(pos):
             self.set(pos, self.moveside)
         self.moveside = -self.moveside
-        self.positions.append(pos)
-        self.save()
+        self.moves.append(self.encode(pos))
+        if len(self.moves) % CHECKPOINT_INTERVAL == 0:
+            self.save()
+
+    def last_move(self) -> int:
+        """最后一手的位置编号，没有则为 -1"""
+        if self.moves and self.moves[-1] != NULL_MOVE:
+            return self.moves[-1]
+        return -1
 
     def save(self):
         history = History(self.b_board, self.w_board, self.moveside)
-        self.history.append(history)
+        self.snapshots[len(self.moves)] = history
 
-    def pop(self):
-        self.history.pop()
-        self.positions.pop()
-        history = self.history[-1]
+    def restore(self, step: int, history: History):
+        """从第 `step` 手后的快照恢复局面，`moves` 需已包含前 `step` 手"""
+        self.snapshots[step] = history
         self.b_board = history.b_board
         self.w_board = history.w_board
         self.moveside = history.moveside
 
-    async def save_record(self, session_id: str):
-        statement = select(GameRecord).where(GameRecord.game_id == self.id)
-        async with get_session() as session:
-            record: Optional[GameRecord] = await session.scalar(statement)
-            if not record:
-                record = GameRecord(
-                    game_id=self.id, session_id=session_id, name=self.name
+    def truncate(self, step: int):
+        """回退到第 `step` 手的快照，需保证该快照存在"""
+        del self.moves[step:]
+        for key in [key for key in self.snapshots if key > step]:
+            del self.snapshots[key]
+        history = self.snapshots[step]
+        self.b_board = history.b_board
+        self.w_board = history.w_board
+        self.moveside = history.moveside
+
+    def pop(self):
+        step = len(self.moves) - 1
+        base = max(key for key in self.snapshots if key <= step)
+        moves = self.moves[base:step]
+        self.truncate(base)
+        for move in moves:
+            self.update(self.decode(move))
+        self.synced_moves = min(self.synced_moves, len(self.moves))
+
+    async def write_record(self, session: AsyncSession, session_id: str):
+        """将对局记录的改动写入 `session`，需要由调用方提交"""
+        values = {
+            "start_time": self.start_time,
+            "update_time": datetime.now(),
+            "is_game_over": self.is_game_over,
+        }
+        if self.player_black:
+            values["player_black_id"] = str(self.player_black.id)
+            values["player_black_name"] = self.player_black.name
+        if self.player_white:
+            values["player_white_id"] = str(self.player_white.id)
+            values["player_white_name"] = self.player_white.name
+        self.update_time = values["update_time"]
+
+        values["b_board"] = f"{self.b_board:x}"
+        values["w_board"] = f"{self.w_board:x}"
+        values["moveside"] = self.moveside
+
+        synced = self.synced_moves
+        saved = self.saved_moves
+        moves: list[GameMove] = []
+        for step, value in enumerate(self.moves[synced:], synced):
+            move = GameMove(
+                game_id=self.id,
+                step=step,
+                position=self.labels[value] if value != NULL_MOVE else "null",
+            )
+            if (step + 1) % CHECKPOINT_INTERVAL == 0 and (
+                history := self.snapshots.get(step + 1)
+            ):
+                move.b_board = f"{history.b_board:x}"
+                move.w_board = f"{history.w_board:x}"
+                move.moveside = history.moveside
+            moves.append(move)
+        self.saved_moves = self.synced_moves = len(self.moves)
+
+        if self.recorded:
+            await session.execute(
+                update(GameRecord).where(GameRecord.game_id == self.id).values(values)
+            )
+        else:
+            session.add(
+                GameRecord(
+                    game_id=self.id, session_id=session_id, name=self.name, **values
+                )
+            )
+            self.recorded = True
+        if saved > synced:
+            await session.execute(
+                delete(GameMove).where(
+                    GameMove.game_id == self.id, GameMove.step >= synced
                 )
+            )
+        session.add_all(moves)
 
-            if self.player_black:
-                record.player_black_id = str(self.player_black.id)
-                record.player_black_name = self.player_black.name
-            if self.player_white:
-                record.player_white_id = str(self.player_white.id)
-                record.player_white_name = self.player_white.name
-            record.start_time = self.start_time
-            self.update_time = datetime.now()
-            record.update_time = self.update_time
-            record.positions = " ".join(str(pos) for pos in self.positions)
-            record.is_game_over = self.is_game_over
-
-            session.add(record)
+    async def save_record(self, session_id: str):
+        async with get_session() as session:
+            await self.write_record(session, session_id)
             await session.commit()
 
     @classmethod
@@ -193,6 +447,10 @@ class Game:
                 return None
             return Player(id, name)
 
+        def load_history(b_board: str, w_board: str, moveside: int) -> History:
+            return History(int(b_board or "0", 16), int(w_board or "0", 16), moveside)
+
+        await record_writer.flush()
         statement = (
             select(GameRecord)
             .where(
@@ -204,8 +462,30 @@ class Game:
         )
         async with get_session() as session:
             record = await session.scalar(statement)
-        if not record:
-            return None
+            if not record:
+                return None
+            result = await session.execute(
+                select(
+                    GameMove.position,
+                    GameMove.b_board,
+                    GameMove.w_board,
+                    GameMove.moveside,
+                )
+                .where(GameMove.game_id == record.game_id)
+                .order_by(GameMove.step)
+            )
+            positions: list[Pos] = []
+            checkpoints: dict[int, History] = {}
+            for position, b_board, w_board, moveside in result:
+                positions.append(Pos.from_str(position))
+                if b_board is not None and w_board is not None and moveside:
+                    checkpoints[len(positions)] = load_history(
+                        b_board, w_board, moveside
+                    )
+            if record.b_board or record.w_board:
+                checkpoints[len(positions)] = load_history(
+                    record.b_board, record.w_board, record.moveside
+                )
 
         game = cls()
         game.id = record.game_id
@@ -217,42 +497,32 @@ class Game:
         )
         game.start_time = record.start_time
         game.update_time = record.update_time
-        positions = [
-            Pos.from_str(pos) for pos in str(record.positions).split(" ") if pos
-        ]
-        for pos in positions:
+        step = max(checkpoints, default=0)
+        game.moves.extend(game.encode(pos) for pos in positions[:step])
+        game.snapshots.update(checkpoints)
+        if step:
+            game.restore(step, checkpoints[step])
+        for pos in positions[step:]:
             game.update(pos)
+        game.recorded = True
+        game.saved_moves = game.synced_moves = len(game.moves)
         return game
 
-    def draw_svg(self):
+    def draw_background(self) -> Svg:
+        """绘制不随局面变化的部分"""
         size = self.size
         placement = self.placement
         view_size = size + (3 if placement == Placement.CROSS else 4)
         svg = Svg(SvgOptions(view_size=view_size, size=view_size * 50)).fill("white")
+        svg.raw(draw_static_svg(size, placement))
+        return svg
 
-        line_group = svg.g(
-            {
-                "stroke": "black",
-                "stroke-width": 0.08,
-                "stroke-linecap": "round",
-            }
-        )
-
-        text_group = svg.g(
-            {
-                "font-size": "0.6",
-                "font-weight": "normal",
-                "style": "font-family: Sans; letter-spacing: 0",
-            }
-        )
-
-        top_text_group = text_group.g({"text-anchor": "middle"})
-        left_text_group = text_group.g({"text-anchor": "end"})
-        bottom_text_group = text_group.g({"text-anchor": "middle"})
-        right_text_group = text_group.g({"text-anchor": "start"})
-        mask_group = svg.g({"fill": "white"})
-        black_group = svg.g({"fill": "black"})
-        white_group = svg.g(
+    def draw_stones(self, parent: Tag, marks: tuple[int, int] = (0, 0)):
+        """在 `parent` 下绘制棋子、最后一手与 `marks` 的标记"""
+        size = self.size
+        mask_group = parent.g({"fill": "white"})
+        black_group = parent.g({"fill": "black"})
+        white_group = parent.g(
             {
                 "fill": "white",
                 "stroke": "black",
@@ -260,71 +530,103 @@ class Game:
             }
         )
 
-        vertical_offset = 0.3 if placement == Placement.CROSS else 0.8
-        horizontal_offset = 0 if placement == Placement.CROSS else 0.5
-        for index in range(2, view_size - 1):
-            line_group.line(index, 2, index, view_size - 2)
-            line_group.line(2, index, view_size - 2, index)
-            if index < size + 2:
-                top_text_group.text(str(index - 1), index + horizontal_offset, 1.3)
-                left_text_group.text(chr(index + 63), 1.3, index + vertical_offset)
-                bottom_text_group.text(
-                    str(index - 1), index + horizontal_offset, view_size - 0.8
+        last = self.last_move()
+
+        offset = 2.5
+        if self.placement == Placement.CROSS:
+            offset = 2
+            mask_group.squares(self.b_board | self.w_board, size, offset, 0.52)
+
+        black_group.circles(self.b_board, size, offset, 0.36)
+        white_group.circles(self.w_board, size, offset, 0.32)
+        if last >= 0:
+            i, j = divmod(last, size)
+            cx = j + offset
+            cy = i + offset
+            if self.b_board >> last & 1:
+                mark = 0.12
+                black_group.rect(
+                    cx - mark, cy - mark, cx + mark, cy + mark, {"fill": "white"}
                 )
-                right_text_group.text(
-                    chr(index + 63), view_size - 1.3, index + vertical_offset
+            elif self.w_board >> last & 1:
+                mark = 0.08
+                white_group.rect(
+                    cx - mark, cy - mark, cx + mark, cy + mark, {"fill": "black"}
                 )
 
-        for i in range(size):
-            for j in range(size):
-                value = self.get(Pos(i, j))
-                if not value:
-                    if (
-                        size >= 13
-                        and size % 2 == 1
-                        and (i == 3 or i == size - 4 or i * 2 == size - 1)
-                        and (j == 3 or j == size - 4 or j * 2 == size - 1)
-                    ):
-                        line_group.circle(j + 2, i + 2, 0.08)
-                    continue
-
-                offset = 2.5
-                if placement == Placement.CROSS:
-                    mask_group.rect(j + 1.48, i + 1.48, j + 2.52, i + 2.52)
-                    offset = 2
-                white_mark = 0.08
-                black_mark = 0.12
-                cx = j + offset
-                cy = i + offset
-                if value == 1:
-                    black_group.circle(cx, cy, 0.36)
-                    if self.positions:
-                        pos = self.positions[-1]
-                        if pos.x == i and pos.y == j:
-                            black_group.rect(
-                                cx - black_mark,
-                                cy - black_mark,
-                                cx + black_mark,
-                                cy + black_mark,
-                                {"fill": "white"},
-                            )
-                else:
-                    white_group.circle(cx, cy, 0.32)
-                    if self.positions:
-                        pos = self.positions[-1]
-                        if pos.x == i and pos.y == j:
-                            white_group.rect(
-                                cx - white_mark,
-                                cy - white_mark,
-                                cx + white_mark,
-                                cy + white_mark,
-                                {"fill": "black"},
-                            )
+        self.draw_marks(parent, marks)
+
+    def draw_marks(self, parent: Tag, marks: tuple[int, int]):
+        """在 `parent` 下以小方块标出 (黑方, 白方) 的位置"""
+        b_marks, w_marks = marks
+        offset = 2 if self.placement == Placement.CROSS else 2.5
+        if b_marks:
+            parent.g({"fill": "black"}).squares(b_marks, self.size, offset, 0.16)
+        if w_marks:
+            parent.g(
+                {"fill": "white", "stroke": "black", "stroke-width": 0.06}
+            ).squares(w_marks, self.size, offset, 0.14)
+
+    def draw_svg(self, marks: tuple[int, int] = (0, 0)):
+        svg = self.draw_background()
+        self.draw_stones(svg, marks)
         return svg
 
-    async def draw(self) -> bytes:
-        svg = self.draw_svg()
-        return await html_to_pic(
-            f'<html><body style="margin: 0;">{svg.outer()}</body></html>',
-            viewport={"width": 100, "height": 100},
+    def image_drawer(self, marks: tuple[int, int] = (0, 0)) -> Callable[[], bytes]:
+        """按当前局面绘制 PNG 的函数，之后局面的改动不影响它，可在其他线程中调用"""
+        return partial(
+            draw_board,
+            self.size,
+            self.placement == Placement.GRID,
+            self.b_board,
+            self.w_board,
+            self.last_move(),
+            marks,
+        )
+
+    def draw_image(self, marks: tuple[int, int] = (0, 0)) -> bytes:
+        return self.image_drawer(marks)()
+
+    def draw_page(self) -> str:
+        """htmlrender 页面的初始内容，棋子层留空，渲染时再替换"""
+        svg = self.draw_background()
+        svg.g({"id": STONES_ID})
+        return f'<html><body style="margin: 0;">{svg.outer()}</body></html>'
+
+    async def draw_html(self, marks: tuple[int, int] = (0, 0)) -> bytes:
+        stones = Tag("g")
+        self.draw_stones(stones, marks)
+        return await page_pool.screenshot(
+            (self.size, self.placement), self.draw_page, stones.inner()
         )
+
+    def image_key(self, marks: tuple[int, int] = (0, 0)) -> tuple:
+        return (
+            self.name,
+            self.size,
+            self.b_board,
+            self.w_board,
+            self.last_move(),
+            marks,
+        )
+
+    async def draw(self, marks: tuple[int, int] = (0, 0)) -> bytes:
+        """绘制当前局面，`marks` 为以小方块标出的 (黑方, 白方) 位置"""
+        if image := image_cache.get(self.image_key(marks)):
+            return image
+        # 带标记的图片单独排队，不与同一对局的普通渲染合并
+        return await render_scheduler.submit(
+            (self.id, marks), partial(self.render, marks), self.rule
+        )
+
+    async def render(self, marks: tuple[int, int] = (0, 0)) -> bytes:
+        """绘制当前局面并放入缓存，由渲染队列调用"""
+        key = self.image_key(marks)
+        with metrics.timer("render", self.rule):
+            if plugin_config.boardgame_renderer == "htmlrender":
+                image = await self.draw_html(marks)
+            else:
+                # 绘制与编码不占用事件循环，多个渲染可以同时进行
+                image = await asyncio.to_thread(self.image_drawer(marks))
+        image_cache.put(key, image)
+        return image
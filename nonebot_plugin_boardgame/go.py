@@ -1,71 +1,193 @@
+import random
+from array import array
+from functools import lru_cache
 from typing import Optional
 
-from .game import Game, MoveResult, Pos
+from .game import Game, History, MoveResult, Pos
 
-directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+@lru_cache
+def zobrist_keys(area: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """每个交叉点上黑子、白子对应的随机键"""
+    rand = random.Random(area)
+    b_keys = tuple(rand.getrandbits(64) for _ in range(area))
+    w_keys = tuple(rand.getrandbits(64) for _ in range(area))
+    return b_keys, w_keys
+
+
+def zobrist(board: int, keys: tuple[int, ...]) -> int:
+    hash = 0
+    while board:
+        low = board & -board
+        hash ^= keys[low.bit_length() - 1]
+        board ^= low
+    return hash
 
 
 class Go(Game):
     name: str = "围棋"
+    rule: str = "go"
+    komi: float = 7.5
+    """黑方的贴目数，按子数之差比较"""
+
+    def __init__(self, size: int = 19):
+        super().__init__(size=size)
+        self.b_keys, self.w_keys = zobrist_keys(self.area)
+        hash = self.zobrist(self.b_board, self.w_board)
+        self.hashes: "array[int]" = array("Q", [hash])
+        """第 `hash_base` 手及之后每一手的局面哈希"""
+        self.hash_base: int = 0
+        """`hashes[0]` 对应的落子数，从快照恢复的对局会缺少此前的哈希"""
+        self.hash_set: set[int] = {hash}
+        """`hashes` 中的全部哈希，不能虚手且禁止全局同形，各局面的哈希互不相同"""
+
+    def zobrist(self, b_board: int, w_board: int) -> int:
+        return zobrist(b_board, self.b_keys) ^ zobrist(w_board, self.w_keys)
+
+    def restore(self, step: int, history: History):
+        super().restore(step, history)
+        self.hashes = array("Q", [self.zobrist(self.b_board, self.w_board)])
+        self.hash_base = step
+        self.hash_set = {self.hashes[0]}
+
+    def expand_hashes(self):
+        """从头重放，补全从快照恢复时缺少的哈希"""
+        if not self.hash_base:
+            return
+        game = Go(self.size)
+        for move in self.moves[: self.hash_base]:
+            game.update(self.decode(move))
+        hashes = game.hashes[:-1]
+        self.hashes[:0] = hashes
+        self.hash_base = 0
+        self.hash_set.update(hashes)
+
+    def truncate(self, step: int):
+        if step < self.hash_base:
+            self.expand_hashes()
+        self.hash_set.difference_update(self.hashes[step - self.hash_base + 1 :])
+        del self.hashes[step - self.hash_base + 1 :]
+        super().truncate(step)
+
+    def adjacent(self, board: int) -> int:
+        """与棋盘上的子上下左右相邻的位置（不一定包含原有的子）"""
+        size = self.size
+        return (
+            (board << 1) & self.not_left
+            | (board >> 1) & self.not_right
+            | board << size
+            | board >> size
+        ) & self.full
+
+    def dilate(self, board: int) -> int:
+        """将棋盘上的子向上下左右各扩张一格（包含原有的子）"""
+        return board | self.adjacent(board)
 
-    def __init__(self):
-        super().__init__(size=19)
-
-    def find_eaten(self, pos: Pos) -> int:
-        value = self.get(pos)
-        if not value:
-            return False
-        found = 0
-
-        def find_life(pos: Pos) -> bool:
-            nonlocal found
-            found |= self.bit(pos)
-            points: list[Pos] = []
-            for dx, dy in directions:
-                p = Pos(pos.x + dx, pos.y + dy)
-                if not self.in_range(p) or (found & self.bit(p)):
-                    continue
-                next = self.get(p)
-                if not next:
-                    return True
-                if next == -value:
-                    continue
-                if next == value:
-                    points.append(p)
-            for p in points:
-                if find_life(p):
-                    return True
-            return False
-
-        return 0 if find_life(pos) else found
+    def group(self, board: int, seed: int) -> int:
+        """在 `board` 中找出与 `seed` 相连的整块棋"""
+        group = seed
+        while True:
+            grown = self.dilate(group) & board
+            if grown == group:
+                return group
+            group = grown
+
+    def legal_moves(self, value: int) -> int:
+        """所有合法落子位置的掩码，排除不入子与全局同形，`value` 须为轮到的一方"""
+        self.expand_hashes()
+        if value == 1:
+            own, opponent = self.b_board, self.w_board
+            keys, opponent_keys = self.b_keys, self.w_keys
+        else:
+            own, opponent = self.w_board, self.b_board
+            keys, opponent_keys = self.w_keys, self.b_keys
+        empty = self.full ^ (own | opponent)
+
+        # 有空的相邻点，或与气不少于 2 口的己方棋相连，落子后都有气
+        moves = empty & self.adjacent(empty)
+        rest = own
+        while rest:
+            group = self.group(own, rest & -rest)
+            rest &= ~group
+            liberties = self.adjacent(group) & empty
+            if liberties & (liberties - 1):
+                moves |= liberties
+        # 只剩一口气的对方棋，在这口气上落子可以提子
+        captures: dict[int, int] = {}
+        rest = opponent
+        while rest:
+            group = self.group(opponent, rest & -rest)
+            rest &= ~group
+            liberties = self.adjacent(group) & empty
+            if liberties and not liberties & (liberties - 1):
+                captures[liberties] = captures.get(liberties, 0) | group
+                moves |= liberties
+
+        hash = self.hashes[-1]
+        board = moves
+        while board:
+            bit = board & -board
+            board ^= bit
+            index = bit.bit_length() - 1
+            next_hash = hash ^ keys[index]
+            if bit in captures:
+                next_hash ^= zobrist(captures[bit], opponent_keys)
+            if next_hash in self.hash_set:
+                moves ^= bit
+        return moves
+
+    def territory(self, dead: int = 0) -> tuple[int, int]:
+        """按中国规则划分归属，返回 (黑方, 白方) 的区域，包括活子与围住的空点
+
+        `dead` 中的子视为死子，提走后计入对方的区域
+        """
+        black = self.b_board & ~dead
+        white = self.w_board & ~dead
+        empty = self.full ^ (black | white)
+        # 从一方的子出发经空点扩张，只有一方能到达的空点归该方
+        black_reach = self.group(empty | black, black)
+        white_reach = self.group(empty | white, white)
+        return black_reach & ~white_reach, white_reach & ~black_reach
 
     def update(self, pos: Pos) -> Optional[MoveResult]:
+        # 判断全局同形需要完整的历史哈希
+        self.expand_hashes()
         moveside = self.moveside
-        self.push(pos)
+        index = pos.x * self.size + pos.y
+        bit = self.bits[index]
+        if moveside == 1:
+            own, opponent = self.b_board | bit, self.w_board
+            keys, opponent_keys = self.b_keys, self.w_keys
+        else:
+            own, opponent = self.w_board | bit, self.b_board
+            keys, opponent_keys = self.w_keys, self.b_keys
+        empty = self.full ^ (own | opponent)
 
+        neighbors = self.neighbors[index] & opponent
         diff = 0
-        for dx, dy in directions:
-            p = Pos(pos.x + dx, pos.y + dy)
-            if not self.in_range(p):
-                continue
-            if self.get(p) == -moveside:
-                diff |= self.find_eaten(p)
-
-        if diff:
-            if moveside == 1:
-                self.w_board ^= diff
-            else:
-                self.b_board ^= diff
-        elif self.find_eaten(pos):
-            self.pop()
+        while neighbors:
+            seed = neighbors & -neighbors
+            group = self.group(opponent, seed)
+            neighbors &= ~group
+            if not self.dilate(group) & empty:
+                diff |= group
+
+        if (
+            not diff
+            and not self.neighbors[index] & empty
+            and not self.dilate(self.group(own, bit)) & empty
+        ):
             raise ValueError("不入子")
 
-        for history in self.history[1:-1]:
-            if (
-                history.b_board
-                and self.b_board == history.b_board
-                and history.w_board
-                and self.w_board == history.w_board
-            ):
-                self.pop()
-                raise ValueError("全局同形")
+        hash = self.hashes[-1] ^ keys[index] ^ zobrist(diff, opponent_keys)
+        # 64 位 Zobrist 哈希冲突的概率可以忽略，不再逐一比对历史局面
+        if hash in self.hash_set:
+            raise ValueError("全局同形")
+
+        if moveside == 1:
+            self.w_board ^= diff
+        else:
+            self.b_board ^= diff
+        self.push(pos)
+        self.hashes.append(hash)
+        self.hash_set.add(hash)
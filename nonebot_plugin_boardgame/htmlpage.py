@@ -0,0 +1,101 @@
+import asyncio
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, Callable, Optional
+
+from nonebot import logger
+
+if TYPE_CHECKING:
+    from playwright.async_api import FloatRect, Page
+
+STONES_ID = "stones"
+"""页面中棋子层的元素 id"""
+
+DEVICE_SCALE_FACTOR = 2
+"""与 `html_to_pic` 的默认值一致"""
+
+
+class BoardPage:
+    __slots__ = ("page", "clip", "lock")
+
+    def __init__(self, page: "Page", clip: "FloatRect"):
+        self.page = page
+        self.clip = clip
+        self.lock = asyncio.Lock()
+
+
+class PagePool:
+    """为每种 (棋盘大小, 布局) 保留一个已加载静态棋盘的浏览器页面
+
+    渲染时只替换棋子层并按固定区域截图，省去每次新建页面、加载内容的开销
+    """
+
+    def __init__(self):
+        self.pages: dict[Hashable, BoardPage] = {}
+        self.lock: Optional[asyncio.Lock] = None
+
+    async def open(self, html: str) -> BoardPage:
+        from nonebot_plugin_htmlrender import get_browser
+
+        browser = await get_browser()
+        page = await browser.new_page(
+            device_scale_factor=DEVICE_SCALE_FACTOR,
+            viewport={"width": 100, "height": 100},
+        )
+        try:
+            await page.set_content(html, wait_until="networkidle")
+            # 与整页截图的范围一致
+            width, height = await page.evaluate(
+                "[document.documentElement.scrollWidth,"
+                " document.documentElement.scrollHeight]"
+            )
+            await page.set_viewport_size({"width": width, "height": height})
+        except Exception:
+            await page.close()
+            raise
+        clip: "FloatRect" = {"x": 0, "y": 0, "width": width, "height": height}
+        return BoardPage(page, clip)
+
+    async def get(self, key: Hashable, draw_page: Callable[[], str]) -> BoardPage:
+        if not self.lock:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            board_page = self.pages.get(key)
+            if board_page and board_page.page.is_closed():
+                board_page = None
+            if not board_page:
+                board_page = self.pages[key] = await self.open(draw_page())
+            return board_page
+
+    async def screenshot(
+        self, key: Hashable, draw_page: Callable[[], str], stones: str
+    ) -> bytes:
+        board_page = await self.get(key, draw_page)
+        async with board_page.lock:
+            page = board_page.page
+            try:
+                await page.evaluate(
+                    "([id, html]) => { document.getElementById(id).innerHTML = html }",
+                    [STONES_ID, stones],
+                )
+                return await page.screenshot(type="png", clip=board_page.clip)
+            except Exception:
+                # 页面出错后丢弃，下次渲染时重新创建
+                if self.pages.get(key) is board_page:
+                    del self.pages[key]
+                await self.close_page(board_page)
+                raise
+
+    async def close_page(self, board_page: BoardPage):
+        try:
+            await board_page.page.close()
+        except Exception as e:
+            logger.debug(f"关闭页面失败：{e!r}")
+
+    async def close(self):
+        pages = list(self.pages.values())
+        self.pages.clear()
+        for board_page in pages:
+            await self.close_page(board_page)
+
+
+page_pool = PagePool()
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+"""直方图的分桶上界，单位为秒"""
+
+
+class Histogram:
+    """累计的分桶计数，另保留最近若干次的耗时用于计算分位数"""
+
+    def __init__(self, window: int = 1024):
+        self.counts: list[int] = [0] * len(BUCKETS)
+        self.count: int = 0
+        self.sum: float = 0
+        self.recent: deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float):
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0
+        values = sorted(self.recent)
+        return values[min(int(len(values) * q), len(values) - 1)]
+
+
+class Metrics:
+    def __init__(self):
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        """键为 (阶段, 规则)"""
+        self.loop_lag = Histogram()
+        self.loop_stalls: int = 0
+        self.loop_task: Optional[asyncio.Task] = None
+
+    def observe(self, stage: str, rule: str, seconds: float):
+        histogram = self.histograms.get((stage, rule))
+        if histogram is None:
+            histogram = self.histograms[(stage, rule)] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, rule: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, rule, time.perf_counter() - start)
+
+    def start_loop_monitor(self, interval: float = 0.5, threshold: float = 0.1):
+        if not self.loop_task or self.loop_task.done():
+            self.loop_task = asyncio.create_task(self.monitor_loop(interval, threshold))
+
+    def stop_loop_monitor(self):
+        if self.loop_task:
+            self.loop_task.cancel()
+            self.loop_task = None
+
+    async def monitor_loop(self, interval: float, threshold: float):
+        """定期休眠并记录实际唤醒的延迟，延迟过大说明事件循环被阻塞"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(loop.time() - start - interval, 0)
+            self.loop_lag.observe(lag)
+            if lag > threshold:
+                self.loop_stalls += 1
+
+    def summary(self) -> str:
+        lines = []
+        for (stage, rule), histogram in sorted(self.histograms.items()):
+            lines.append(
+                f"{rule} {stage}：{histogram.count} 次，"
+                f"p50 {histogram.quantile(0.5) * 1000:.1f}ms，"
+                f"p95 {histogram.quantile(0.95) * 1000:.1f}ms"
+            )
+        lines.append(
+            f"事件循环延迟：p95 {self.loop_lag.quantile(0.95) * 1000:.1f}ms，"
+            f"阻塞 {self.loop_stalls} 次"
+        )
+        return "\n".join(lines)
+
+    def render(self) -> str:
+        """以 Prometheus 文本格式输出所有指标"""
+        from .cache import image_cache
+        from .persist import record_writer
+        from .render import render_scheduler
+
+        lines: list[str] = []
+
+        def histogram(name: str, labels: str, histogram: Histogram):
+            count = 0
+            for bound, bucket in zip(BUCKETS, histogram.counts):
+                count += bucket
+                lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {histogram.count}')
+            labels = labels.rstrip(",")
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        def metric(name: str, type: str, value: float, help: str):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            lines.append(f"{name} {value}")
+
+        lines.append("# HELP boardgame_stage_seconds 处理指令各阶段的耗时")
+        lines.append("# TYPE boardgame_stage_seconds histogram")
+        for (stage, rule), value in sorted(self.histograms.items()):
+            histogram(
+                "boardgame_stage_seconds", f'stage="{stage}",rule="{rule}",', value
+            )
+        lines.append("# HELP boardgame_event_loop_lag_seconds 事件循环的唤醒延迟")
+        lines.append("# TYPE boardgame_event_loop_lag_seconds histogram")
+        histogram("boardgame_event_loop_lag_seconds", "", self.loop_lag)
+        metric(
+            "boardgame_event_loop_stalls_total",
+            "counter",
+            self.loop_stalls,
+            "事件循环延迟超过阈值的次数",
+        )
+
+        metric(
+            "boardgame_record_writer_pending",
+            "gauge",
+            record_writer.depth,
+            "等待写入的对局数",
+        )
+        metric(
+            "boardgame_record_writer_flushes_total",
+            "counter",
+            record_writer.flush_count,
+            "批量写入次数",
+        )
+        metric(
+            "boardgame_record_writer_writes_total",
+            "counter",
+            record_writer.write_count,
+            "写入的对局记录数",
+        )
+        metric(
+            "boardgame_record_writer_errors_total",
+            "counter",
+            record_writer.error_count,
+            "写入失败次数",
+        )
+        metric(
+            "boardgame_record_writer_last_flush_seconds",
+            "gauge",
+            record_writer.last_flush_latency,
+            "最近一次写入的耗时",
+        )
+
+        metric(
+            "boardgame_image_cache_hits_total",
+            "counter",
+            image_cache.hits,
+            "图片缓存命中次数",
+        )
+        metric(
+            "boardgame_image_cache_misses_total",
+            "counter",
+            image_cache.misses,
+            "图片缓存未命中次数",
+        )
+        metric(
+            "boardgame_image_cache_bytes",
+            "gauge",
+            image_cache.size,
+            "图片缓存占用的字节数",
+        )
+        metric(
+            "boardgame_image_cache_entries",
+            "gauge",
+            len(image_cache.images),
+            "图片缓存中的图片数",
+        )
+
+        metric(
+            "boardgame_render_queue_depth",
+            "gauge",
+            render_scheduler.depth,
+            "等待渲染的会话数",
+        )
+        metric(
+            "boardgame_render_running",
+            "gauge",
+            render_scheduler.running,
+            "正在进行的渲染数",
+        )
+        metric(
+            "boardgame_render_total",
+            "counter",
+            render_scheduler.rendered,
+            "完成的渲染次数",
+        )
+        metric(
+            "boardgame_render_coalesced_total",
+            "counter",
+            render_scheduler.coalesced,
+            "排队时被合并的渲染请求数",
+        )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
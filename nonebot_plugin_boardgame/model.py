@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import Optional
 
 from nonebot_plugin_orm import Model
-from sqlalchemy import String, Text
+from sqlalchemy import Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -9,10 +10,19 @@ class GameRecord(Model):
     """对局记录"""
 
     __tablename__ = "nonebot_plugin_boardgame_gamerecord"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index(
+            "ix_nonebot_plugin_boardgame_gamerecord_resume",
+            "session_id",
+            "name",
+            "is_game_over",
+            "update_time",
+        ),
+        {"extend_existing": True},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    game_id: Mapped[str] = mapped_column(String(128))
+    game_id: Mapped[str] = mapped_column(String(128), index=True, unique=True)
     session_id: Mapped[str] = mapped_column(String(128))
     name: Mapped[str] = mapped_column(String(32))
     start_time: Mapped[datetime] = mapped_column(default=datetime.now())
@@ -28,6 +38,30 @@ class GameRecord(Model):
     player_white_name: Mapped[str] = mapped_column(Text, default="")
     """ 白方名字 """
     positions: Mapped[str] = mapped_column(Text, default="")
-    """ 所有落子位置的字符串，以空格分隔 """
+    """ 已弃用，落子位置改为记录在 `GameMove` 中 """
+    b_board: Mapped[str] = mapped_column(Text, default="")
+    """ 当前局面黑子位置，十六进制 """
+    w_board: Mapped[str] = mapped_column(Text, default="")
+    """ 当前局面白子位置，十六进制 """
+    moveside: Mapped[int] = mapped_column(default=1)
+    """ 当前局面轮到哪一方，1 为黑方，-1 为白方 """
     is_game_over: Mapped[bool] = mapped_column(default=False)
     """ 游戏是否已结束 """
+
+
+class GameMove(Model):
+    """落子记录"""
+
+    __tablename__ = "nonebot_plugin_boardgame_gamemove"
+    __table_args__ = {"extend_existing": True}
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    game_id: Mapped[str] = mapped_column(String(128), index=True)
+    step: Mapped[int]
+    """ 第几手，从 0 开始 """
+    position: Mapped[str] = mapped_column(String(8))
+    """ 落子位置，跳过为 null """
+    b_board: Mapped[Optional[str]] = mapped_column(Text)
+    """ 落子后局面的快照，每隔若干手记录一次 """
+    w_board: Mapped[Optional[str]] = mapped_column(Text)
+    moveside: Mapped[Optional[int]]
@@ -1,12 +1,15 @@
 from typing import Optional
 
-from .game import Game, MoveResult, Placement, Pos
+from boardgame_engine.bitboard import popcount
+from boardgame_engine.othello_ai import flips, legal_moves, search
 
-delta = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+from .game import Game, MoveResult, Placement, Pos
 
 
 class Othello(Game):
     name: str = "黑白棋"
+    rule: str = "othello"
+    ai_search = staticmethod(search)
 
     def __init__(self):
         size = 8
@@ -17,49 +20,36 @@ class Othello(Game):
         self.set(Pos(mid - 1, mid), 1)
         self.set(Pos(mid, mid - 1), 1)
         self.set(Pos(mid, mid), -1)
-        self.history.pop()
         self.save()
 
+    def boards(self, value: int) -> tuple[int, int]:
+        """返回 (己方, 对方) 棋盘"""
+        if value == 1:
+            return self.b_board, self.w_board
+        return self.w_board, self.b_board
+
     def legal(self, pos: Pos, value: int) -> int:
-        diff = 0
-        for dx, dy in delta:
-            p = Pos(pos.x + dx, pos.y + dy)
-            if not self.in_range(p) or self.get(p) != -value:
-                continue
-            temp = 0
-            while True:
-                temp |= self.bit(p)
-                p.x += dx
-                p.y += dy
-                if not self.in_range(p) or self.get(p) != -value:
-                    break
-            if self.in_range(p) and self.get(p) == value:
-                diff |= temp
-        return diff
+        """在 `pos` 落子会翻转的棋子，与 AI 共用 `othello_ai` 的走法生成"""
+        own, opponent = self.boards(value)
+        bit = self.bit(pos)
+        if (own | opponent) & bit:
+            return 0
+        return flips(own, opponent, bit)
+
+    def legal_moves(self, value: int) -> int:
+        """所有合法落子位置的掩码"""
+        return legal_moves(*self.boards(value))
 
     def has_legal_move(self, value: int) -> bool:
-        size = self.size
-        for i in range(size):
-            for j in range(size):
-                p = Pos(i, j)
-                if not self.get(p) and self.legal(p, value):
-                    return True
-        return False
+        return bool(self.legal_moves(value))
 
     def check(self) -> MoveResult:
-        def total(board: int) -> int:
-            count = 0
-            for i in range(self.area):
-                count += 1 if board & 1 << i else 0
-            return count
-
-        b_count = total(self.b_board)
-        w_count = total(self.w_board)
-
-        def sign(a: int):
-            return 1 if a > 0 else -1 if a < 0 else 0
+        b_count = popcount(self.b_board)
+        w_count = popcount(self.w_board)
 
-        return MoveResult(sign(b_count - w_count))
+        if b_count == w_count:
+            return MoveResult.DRAW
+        return MoveResult.BLACK_WIN if b_count > w_count else MoveResult.WHITE_WIN
 
     def update(self, pos: Pos) -> Optional[MoveResult]:
         if not self.in_range(pos):
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Optional
+
+from nonebot import logger
+from nonebot_plugin_orm import get_session
+
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from .game import Game
+
+
+class RecordWriter:
+    """在后台批量保存对局记录，同一局游戏的多次更新只写入一次"""
+
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self.pending: dict[str, tuple["Game", str]] = {}
+        self.lock: Optional[asyncio.Lock] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stopping: bool = False
+        self.flush_count: int = 0
+        self.write_count: int = 0
+        self.error_count: int = 0
+        self.last_flush_latency: float = 0
+        """最近一次写入耗时，单位为秒"""
+
+    @property
+    def depth(self) -> int:
+        return len(self.pending)
+
+    def add(self, game: "Game", session_id: str):
+        self.pending[game.id] = (game, session_id)
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        while self.pending and not self.stopping:
+            await asyncio.sleep(self.delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"保存对局记录失败：{e!r}")
+
+    async def flush(self):
+        if not self.lock:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            if not self.pending:
+                return
+            batch = self.pending
+            self.pending = {}
+            states = {
+                id: (game.recorded, game.saved_moves) for id, (game, _) in batch.items()
+            }
+            start = time.perf_counter()
+            try:
+                async with get_session() as session:
+                    for game, session_id in batch.values():
+                        with metrics.timer("save", game.rule):
+                            await game.write_record(session, session_id)
+                    await session.commit()
+            except Exception:
+                self.error_count += 1
+                # 回滚后数据库中的记录没有变化，下次重新写入全部落子
+                for id, (game, session_id) in batch.items():
+                    game.recorded, game.saved_moves = states[id]
+                    game.synced_moves = 0
+                    self.pending.setdefault(id, (game, session_id))
+                raise
+            finally:
+                self.last_flush_latency = time.perf_counter() - start
+            self.flush_count += 1
+            self.write_count += len(batch)
+
+    async def stop(self):
+        # 不能取消任务：取消可能发生在写入途中，已从 `pending` 取出的记录会丢失
+        self.stopping = True
+        if self.task:
+            await self.task
+            self.task = None
+        await self.flush()
+
+
+record_writer = RecordWriter()
@@ -0,0 +1,81 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Hashable
+from typing import Callable
+
+from .config import plugin_config
+from .metrics import metrics
+
+
+class RenderJob:
+    __slots__ = ("render", "rule", "future", "queued_at")
+
+    def __init__(
+        self,
+        render: Callable[[], Awaitable[bytes]],
+        rule: str,
+        future: "asyncio.Future[bytes]",
+        queued_at: float,
+    ):
+        self.render = render
+        self.rule = rule
+        self.future = future
+        self.queued_at = queued_at
+
+
+class RenderScheduler:
+    """限制同时进行的渲染数量，各会话轮流渲染
+
+    每个会话在队列中最多有一个任务，排队期间的重复请求会合并，只渲染最新的局面
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(concurrency, 1)
+        self.jobs: dict[Hashable, RenderJob] = {}
+        self.queue: deque[Hashable] = deque()
+        self.workers: set[asyncio.Task] = set()
+        self.running: int = 0
+        self.coalesced: int = 0
+        self.rendered: int = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self.queue)
+
+    async def submit(
+        self, key: Hashable, render: Callable[[], Awaitable[bytes]], rule: str
+    ) -> bytes:
+        job = self.jobs.get(key)
+        if job:
+            job.render = render
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            job = RenderJob(render, rule, loop.create_future(), loop.time())
+            self.jobs[key] = job
+            self.queue.append(key)
+            if len(self.workers) < self.concurrency:
+                self.workers.add(asyncio.create_task(self.work()))
+        # 多个请求共用同一个结果，其中一个被取消时不影响其他请求
+        return await asyncio.shield(job.future)
+
+    async def work(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.queue:
+                job = self.jobs.pop(self.queue.popleft())
+                metrics.observe("queue_wait", job.rule, loop.time() - job.queued_at)
+                self.running += 1
+                try:
+                    job.future.set_result(await job.render())
+                except Exception as e:
+                    job.future.set_exception(e)
+                finally:
+                    self.running -= 1
+                    self.rendered += 1
+        finally:
+            # 队列为空后立即移出，不能等任务结束的回调，否则期间提交的任务没有人处理
+            self.workers.discard(asyncio.current_task())
+
+
+render_scheduler = RenderScheduler(plugin_config.boardgame_render_concurrency)
@@ -0,0 +1,47 @@
+import asyncio
+import heapq
+from collections.abc import Awaitable
+from typing import Callable, Optional
+
+from nonebot import logger
+
+
+class TimeoutScheduler:
+    """用惰性删除的最小堆记录各会话的超时时间，由单个任务定期检查"""
+
+    def __init__(self, callback: Callable[[str], Awaitable[None]], interval: float = 1):
+        self.callback = callback
+        self.interval = interval
+        self.deadlines: dict[str, float] = {}
+        self.heap: list[tuple[float, str]] = []
+        self.task: Optional[asyncio.Task] = None
+
+    def set(self, session_id: str, timeout: float):
+        deadline = asyncio.get_running_loop().time() + timeout
+        self.deadlines[session_id] = deadline
+        heapq.heappush(self.heap, (deadline, session_id))
+        # 堆中过期的条目过多时重建
+        if len(self.heap) > 2 * len(self.deadlines) + 64:
+            self.heap = [(deadline, id) for id, deadline in self.deadlines.items()]
+            heapq.heapify(self.heap)
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def cancel(self, session_id: str):
+        self.deadlines.pop(session_id, None)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while self.deadlines:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            while self.heap and self.heap[0][0] <= now:
+                deadline, session_id = heapq.heappop(self.heap)
+                if self.deadlines.get(session_id) != deadline:
+                    continue
+                del self.deadlines[session_id]
+                try:
+                    await self.callback(session_id)
+                except Exception as e:
+                    logger.warning(f"处理超时失败：{e!r}")
+        self.heap.clear()
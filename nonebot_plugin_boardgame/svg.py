@@ -14,7 +14,17 @@ def escape_html(source: str) -> str:
     )
 
 
+def format_value(value: Union[str, float, bool]) -> str:
+    if type(value) is float:
+        return f"{value:.3f}".rstrip("0").rstrip(".")
+    if type(value) is int or type(value) is bool:
+        return str(value)
+    return escape_html(str(value))
+
+
 class Tag:
+    __slots__ = ("tag", "parent", "children", "attributes", "inner_text")
+
     def __init__(self, tag: str):
         self.tag = tag
         self.parent: Optional[Tag] = None
@@ -22,12 +32,14 @@ class Tag:
         self.attributes: Attributes = {}
         self.inner_text: str = ""
 
-    def child(self, tag: str) -> "Tag":
-        child = Tag(tag)
+    def add(self, child: "Tag") -> "Tag":
         child.parent = self
         self.children.append(child)
         return child
 
+    def child(self, tag: str) -> "Tag":
+        return self.add(Tag(tag))
+
     def attr(self, attributes: Attributes) -> "Tag":
         self.attributes.update(attributes)
         return self
@@ -58,23 +70,95 @@ class Tag:
         self.child("text").attr({"x": x, "y": y, **attr}).data(text)
         return self
 
+    def raw(self, source: str) -> "Tag":
+        self.add(Raw(source))
+        return self
+
+    def circles(self, board: int, columns: int, offset: float, r: float) -> "Tag":
+        """在位棋盘上每个为 1 的位置画一个圆"""
+        self.add(BitShapes("circle", board, columns, offset, r))
+        return self
+
+    def squares(self, board: int, columns: int, offset: float, r: float) -> "Tag":
+        """在位棋盘上每个为 1 的位置画一个边长为 `2r` 的正方形"""
+        self.add(BitShapes("rect", board, columns, offset, r))
+        return self
+
     def g(self, attr: Attributes = {}) -> "Tag":
         return self.child("g").attr(attr)
 
+    def write(self, buffer: list[str]):
+        append = buffer.append
+        append("<" + self.tag)
+        for key, value in self.attributes.items():
+            append(f' {key}="{format_value(value)}"')
+        append(" >")
+        if self.children:
+            for child in self.children:
+                child.write(buffer)
+        else:
+            append(self.inner_text)
+        append(f"</{self.tag}>")
+
     def outer(self) -> str:
-        attr_text = " ".join(
-            [
-                f'{key}="{escape_html(str(value))}"'
-                for key, value in self.attributes.items()
-            ]
-        )
-        return f"<{self.tag} {attr_text} >{self.inner()}</{self.tag}>"
+        buffer: list[str] = []
+        self.write(buffer)
+        return "".join(buffer)
 
     def inner(self) -> str:
-        if self.children:
-            return "".join([child.outer() for child in self.children])
-        else:
+        if not self.children:
             return self.inner_text
+        buffer: list[str] = []
+        for child in self.children:
+            child.write(buffer)
+        return "".join(buffer)
+
+
+class Raw(Tag):
+    """已序列化的 SVG 片段，输出时原样写入"""
+
+    __slots__ = ("source",)
+
+    def __init__(self, source: str):
+        super().__init__("")
+        self.source = source
+
+    def write(self, buffer: list[str]):
+        buffer.append(self.source)
+
+
+class BitShapes(Tag):
+    """根据位棋盘直接输出一组圆形或正方形，不为每个图形创建节点"""
+
+    __slots__ = ("board", "columns", "offset", "r")
+
+    def __init__(self, tag: str, board: int, columns: int, offset: float, r: float):
+        super().__init__(tag)
+        self.board = board
+        self.columns = columns
+        self.offset = offset
+        self.r = r
+
+    def write(self, buffer: list[str]):
+        append = buffer.append
+        board = self.board
+        columns = self.columns
+        if self.tag == "circle":
+            start = self.offset
+            r = format_value(float(self.r))
+            template = f'<circle cx="{{x}}" cy="{{y}}" r="{r}" ></circle>'
+        else:
+            start = self.offset - self.r
+            side = format_value(float(self.r * 2))
+            template = (
+                f'<rect x="{{x}}" y="{{y}}" width="{side}" height="{side}" ></rect>'
+            )
+        coords = [format_value(float(i + start)) for i in range(columns)]
+        while board:
+            low = board & -board
+            board ^= low
+            i, j = divmod(low.bit_length() - 1, columns)
+            append(template.format(x=coords[j], y=coords[i]))
 
 
 @dataclass
@@ -96,6 +180,8 @@ class SvgOptions:
 
 
 class Svg(Tag):
+    __slots__ = ("width", "height", "view")
+
     def __init__(self, options: SvgOptions = SvgOptions()):
         super().__init__("svg")
         size = options.size or 200
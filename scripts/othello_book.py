@@ -0,0 +1,93 @@
+"""生成黑白棋 AI 的开局库 `boardgame_engine/othello_book.bin`
+
+从初始局面出发，AI 执黑或执白时分别展开：轮到 AI 时按固定深度搜索出最佳落子
+并只沿该手继续，轮到对手时展开所有合法落子，直到 `BOOK_PLIES` 手。
+局面按 8 种对称变换取规范形式去重。
+
+用法：python -m scripts.othello_book [--depth 6]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import nonebot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=6, help="搜索深度")
+    args = parser.parse_args()
+
+    nonebot.init(
+        driver="~none",
+        log_level="WARNING",
+        sqlalchemy_database_url=(
+            f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'boardgame.db'}"
+        ),
+    )
+    nonebot.load_plugin("nonebot_plugin_boardgame")
+
+    from boardgame_engine.bitboard import bits
+    from boardgame_engine.othello_ai import (
+        BOOK_MAGIC,
+        BOOK_PATH,
+        BOOK_PLIES,
+        BOOK_RECORD,
+        Searcher,
+        canonical,
+        flips,
+        legal_moves,
+        symmetry,
+    )
+    from nonebot_plugin_boardgame.othello import Othello
+
+    book: dict[tuple[int, int], int] = {}
+    visited: set[tuple[int, int, bool]] = set()
+    start = time.perf_counter()
+
+    def expand(own: int, opponent: int, plies: int, ai_turn: bool):
+        if plies > BOOK_PLIES:
+            return
+        own_key, opponent_key, index = canonical(own, opponent)
+        if (own_key, opponent_key, ai_turn) in visited:
+            return
+        visited.add((own_key, opponent_key, ai_turn))
+        moves = legal_moves(own, opponent)
+        if not moves:
+            return
+        if ai_turn:
+            key = (own_key, opponent_key)
+            if key not in book:
+                searcher = Searcher(float("inf"))
+                _, bit = searcher.negamax(
+                    own_key, opponent_key, args.depth, -(1 << 30), 1 << 30
+                )
+                book[key] = bit.bit_length() - 1
+            # 规范形式下的落子变换回当前局面
+            bit = 1 << book[key]
+            matches = [move for move in bits(moves) if symmetry(move, index) == bit]
+            candidates = matches[:1]
+        else:
+            candidates = bits(moves)
+        for bit in candidates:
+            diff = flips(own, opponent, bit)
+            expand(opponent ^ diff, own | bit | diff, plies + 1, not ai_turn)
+
+    game = Othello()
+    for ai_black in (True, False):
+        expand(game.b_board, game.w_board, 0, ai_black)
+
+    with BOOK_PATH.open("wb") as file:
+        file.write(BOOK_MAGIC)
+        for (own, opponent), move in sorted(book.items()):
+            file.write(BOOK_RECORD.pack(own, opponent, move))
+    print(
+        f"{len(book)} positions written to {BOOK_PATH} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()